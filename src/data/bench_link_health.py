@@ -0,0 +1,162 @@
+"""
+Offline benchmark and accuracy check of link_health.py. A local origin
+stands in for the file host: every file has a size derived from its path,
+some are gone (404), some hosts refuse HEAD so the range fallback is used,
+and every answer is delayed a little. The scanner runs on a generated catalog
+twice, cold and then from the cache, and its results are compared with what
+the origin actually serves.
+
+    python src/data/bench_link_health.py [--links 5000] [--latency 0.02] [--per-host 8]
+"""
+import argparse
+import http.server
+import json
+import os
+import tempfile
+import threading
+import time
+import zlib
+
+from bench_pipeline import _QuietServer, offline_adapter_class
+
+# Share of links the origin answers with 404
+DEAD_RATE = 0.1
+# Hosts that answer HEAD with 405, like some file hosts do
+NO_HEAD_HOSTS = {'nohead.example'}
+HOSTS = ['pixeldra.in', 'nohead.example']
+
+def file_size(path):
+    return 50 * 1024 * 1024 + zlib.crc32(path.encode('utf-8')) % (1024 * 1024 * 1024)
+
+def is_dead(path):
+    return zlib.crc32(path.encode('utf-8')[::-1]) % 1000 < DEAD_RATE * 1000
+
+class LinkOrigin:
+    """HTTP server that answers HEAD and range GETs for /<host>/<path> without sending any body"""
+
+    def __init__(self, latency=0.02):
+        self.latency = latency
+        self.requests = {'HEAD': 0, 'GET': 0}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        origin = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_HEAD(self):
+                origin.handle(self, 'HEAD')
+
+            def do_GET(self):
+                origin.handle(self, 'GET')
+
+            def log_message(self, *args):
+                pass
+
+        self.server = _QuietServer(('127.0.0.1', 0), Handler)
+        self.port = self.server.server_port
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def handle(self, handler, method):
+        with self._lock:
+            self.requests[method] += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+            host, _, path = handler.path.lstrip('/').partition('?')[0].partition('/')
+            if method == 'HEAD' and host in NO_HEAD_HOSTS:
+                status, headers = 405, {'Content-Length': '0'}
+            elif is_dead(path):
+                status, headers = 404, {'Content-Length': '0'}
+            elif method == 'GET' and handler.headers.get('Range') == 'bytes=0-0':
+                status, headers = 206, {'Content-Range': f"bytes 0-0/{file_size(path)}", 'Content-Length': '1'}
+            else:
+                status, headers = 200, {'Content-Length': str(file_size(path))}
+            handler.send_response(status)
+            for name, value in headers.items():
+                handler.send_header(name, value)
+            handler.end_headers()
+            if status == 206 and method == 'GET':
+                handler.wfile.write(b'\0')
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+def generate_catalog(links):
+    """Movie records with three final_links each, a few sizes deliberately wrong"""
+    records = []
+    for i in range(0, links, 3):
+        final_links = []
+        for n in range(i, min(i + 3, links)):
+            host = HOSTS[n % len(HOSTS)]
+            path = f"api/file/link{n}"
+            size = file_size(path) * (2 if n % 17 == 0 else 1)
+            final_links.append({'url': f"https://{host}/{path}?download", 'quality': '720p',
+                                'size': f"{size / 1024 ** 2:.0f}MB"})
+        records.append({'title': f"Synthetic Movie {i}", 'final_links': final_links})
+    return records
+
+def check_accuracy(catalog_file):
+    """Count links whose recorded health disagrees with what the origin serves"""
+    wrong = checked = 0
+    from json_stream import iter_json_array
+    for record in iter_json_array(catalog_file):
+        for link in record['final_links']:
+            path = link['url'].split('/', 3)[3].split('?')[0]
+            health = link['health']
+            expected_alive = not is_dead(path)
+            checked += 1
+            if health['alive'] != expected_alive or (expected_alive and health['content_length'] != file_size(path)):
+                wrong += 1
+    return checked, wrong
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--links', type=int, default=5000)
+    parser.add_argument('--latency', type=float, default=0.02, help="seconds the origin waits before answering")
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--per-host', type=int, default=8)
+    args = parser.parse_args()
+
+    from http_client import PooledHttpClient
+    from link_health import LinkHealthCache, scan_catalogs
+
+    origin = LinkOrigin(latency=args.latency).start()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            catalog_file = os.path.join(workdir, 'movies.json')
+            with open(catalog_file, 'w', encoding='utf-8') as f:
+                json.dump(generate_catalog(args.links), f)
+            # Every host ends up at the one local origin, so its pool must fit all of them
+            client = PooledHttpClient(max_per_domain=args.per_host, pool_size=args.per_host * len(HOSTS),
+                                      adapter_class=offline_adapter_class(origin.port, None, set()))
+            cache = LinkHealthCache(os.path.join(workdir, 'link_health.sqlite'))
+
+            timings = []
+            for label in ('cold', 'cached'):
+                started = time.perf_counter()
+                scan_catalogs([catalog_file], client=client, cache=cache, workers=args.workers)
+                timings.append((label, time.perf_counter() - started))
+            checked, wrong = check_accuracy(catalog_file)
+            cache.close()
+    finally:
+        origin.stop()
+
+    print()
+    for label, seconds in timings:
+        print(f"{label:7s} {seconds:8.2f}s  {args.links / seconds:10.1f} links/s")
+    print(f"requests: {origin.requests['HEAD']} HEAD, {origin.requests['GET']} range GET; "
+          f"at most {origin.max_in_flight} in flight ({args.per_host} per host x {len(HOSTS)} hosts)")
+    print(f"accuracy: {checked - wrong}/{checked} links match the origin")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark the series normalizer: records/s and MB/s for one process against a
+process pool, on a dump built by repeating the records of a real raw file.
+Parsing alone is timed separately from the full file-to-file run, since
+encoding indented JSON costs more than the parsing itself.
+
+    python src/data/bench_normalizer.py [--copies 50] [--workers 4]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from json_stream import iter_json_array, JsonArrayWriter
+from series_normalizer import normalize_file, normalize_series_record
+
+def build_dump(source, path, copies):
+    """Write source's records copies times over, with unique titles"""
+    records = list(iter_json_array(source))
+    with JsonArrayWriter(path) as writer:
+        for copy in range(copies):
+            for record in records:
+                writer.write(dict(record, title=f"{record.get('title')} #{copy}"))
+    return writer.count
+
+def run(input_file, output_file, workers, indent):
+    started = time.perf_counter()
+    count = normalize_file(input_file, output_file, workers, indent=indent)
+    return count, time.perf_counter() - started
+
+def report(label, count, seconds, megabytes):
+    print(f"{label:24s} {seconds:7.2f}s  {count / seconds:9.0f} records/s  {megabytes / seconds:7.1f} MB/s")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source', default="src/data/series_ready_for_db.json")
+    parser.add_argument('--copies', type=int, default=50, help="times the source records are repeated")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        dump = os.path.join(work_dir, 'dump.json')
+        records = build_dump(args.source, dump, args.copies)
+        megabytes = os.path.getsize(dump) / (1024 * 1024)
+        print(f"Dump: {records} records, {megabytes:.1f} MB")
+
+        raw = list(iter_json_array(dump))
+        started = time.perf_counter()
+        for record in raw:
+            normalize_series_record(record)
+        report("parse only, 1 process", len(raw), time.perf_counter() - started, megabytes)
+        del raw
+
+        results = {}
+        for workers in sorted({1, args.workers}):
+            count, seconds = run(dump, os.path.join(work_dir, f"out_{workers}.json"), workers, None)
+            results[workers] = seconds
+            report(f"compact, {workers} worker(s)", count, seconds, megabytes)
+        count, seconds = run(dump, os.path.join(work_dir, 'out_indented.json'), args.workers, 2)
+        report(f"indented, {args.workers} worker(s)", count, seconds, megabytes)
+
+        with open(os.path.join(work_dir, 'out_1.json'), 'r', encoding='utf-8') as f:
+            single = json.load(f)
+        with open(os.path.join(work_dir, f"out_{args.workers}.json"), 'r', encoding='utf-8') as f:
+            assert json.load(f) == single, "parallel output differs from single-process output"
+
+    if args.workers > 1:
+        print(f"speedup: {results[1] / results[args.workers]:.1f}x")
+
+if __name__ == "__main__":
+    main()
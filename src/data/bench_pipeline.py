@@ -0,0 +1,317 @@
+"""
+Offline end-to-end benchmark of randomabc.py. A local HTTP origin plays every
+image host the pipeline talks to (vegamovies, imgbb, the weserv/archive
+mirrors, ...) with configurable latency, error rates, chunked responses and
+dead hosts, and fake_storage.FakeBucket stands in for Firebase Storage.
+process_series_json and process_movies_json then run on generated catalogs.
+
+Every run happens in its own process and scratch directory, so caches start
+cold and peak RSS is per run. Results are appended to a JSONL file so runs
+can be compared over time.
+
+    python src/data/bench_pipeline.py --titles 100 1000 [--kinds series movies]
+    python src/data/bench_pipeline.py --titles 100000 --latency 0 --error-rate 0
+"""
+import argparse
+import http.server
+import io
+import json
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit
+
+RESULTS_FILE = os.path.join('temp_images', 'bench_pipeline_results.jsonl')
+
+# How each host behaves: base latency (s), share of 500 responses, share of
+# chunked responses, whether it answers with an HTML page, or is unreachable
+HOST_PROFILES = {
+    'vegamovies.ps': {'latency': 0.05, 'error_rate': 0.15, 'chunked_rate': 0.3},
+    'vegamovies.st': {'dead': True},
+    'imgbb.top': {'latency': 0.03, 'error_rate': 0.05, 'chunked_rate': 0.5},
+    'images.weserv.nl': {'latency': 0.08, 'error_rate': 0.02, 'chunked_rate': 1.0},
+    'wsrv.nl': {'latency': 0.08, 'error_rate': 0.02},
+    'web.archive.org': {'latency': 0.6, 'error_rate': 0.3},
+    'webcache.googleusercontent.com': {'dead': True},
+    'www.google.com': {'latency': 0.05, 'html': True},
+    'www.themoviedb.org': {'latency': 0.05, 'html': True},
+    'img.freepik.com': {'latency': 0.02, 'missing': True}
+}
+
+def _base_images():
+    """A few pre-encoded JPEGs; every response gets a unique comment segment on top"""
+    from PIL import Image
+    images = []
+    for width, height, color in ((600, 900, (40, 60, 90)), (1280, 720, (90, 40, 30)), (300, 450, (20, 80, 40))):
+        buf = io.BytesIO()
+        Image.new('RGB', (width, height), color).save(buf, 'JPEG', quality=80)
+        images.append(buf.getvalue())
+    return images
+
+def unique_jpeg(base, key):
+    """Insert a COM segment after SOI so each URL serves different (valid) bytes"""
+    comment = key.encode('utf-8')[:60000]
+    segment = b'\xff\xfe' + (len(comment) + 2).to_bytes(2, 'big') + comment
+    return base[:2] + segment + base[2:]
+
+class SyntheticOrigin:
+    """
+    Threaded HTTP server answering for every simulated host. Requests arrive
+    as /<host>/<path> (see OfflineAdapter); the host's profile decides the
+    response.
+    """
+
+    def __init__(self, profiles=None, latency_scale=1.0, error_rate=None, seed=1):
+        self.profiles = profiles or HOST_PROFILES
+        self.latency_scale = latency_scale
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.images = _base_images()
+        self.requests = 0
+        origin = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                origin.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = _QuietServer(('127.0.0.1', 0), Handler)
+        self.port = self.server.server_port
+        # A port nothing listens on, for dead hosts
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            self.dead_port = s.getsockname()[1]
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _roll(self):
+        with self.random_lock:
+            return self.random.random()
+
+    def _send(self, handler, status, body, content_type, chunked=False):
+        handler.send_response(status)
+        handler.send_header('Content-Type', content_type)
+        if chunked:
+            handler.send_header('Transfer-Encoding', 'chunked')
+            handler.end_headers()
+            for start in range(0, len(body), 16384):
+                chunk = body[start:start + 16384]
+                handler.wfile.write(f"{len(chunk):x}\r\n".encode('ascii') + chunk + b'\r\n')
+            handler.wfile.write(b'0\r\n\r\n')
+        else:
+            handler.send_header('Content-Length', str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+
+    def handle(self, handler):
+        self.requests += 1
+        host, _, path = handler.path.lstrip('/').partition('/')
+        profile = self.profiles.get(host, {'missing': True})
+
+        latency = profile.get('latency', 0) * self.latency_scale
+        if latency:
+            # Up to +100% jitter
+            time.sleep(latency * (1 + self._roll()))
+
+        error_rate = profile.get('error_rate', 0) if self.error_rate is None else self.error_rate
+        if profile.get('missing'):
+            return self._send(handler, 404, b'not found', 'text/plain')
+        if profile.get('html'):
+            return self._send(handler, 200, b'<html><body>search results</body></html>', 'text/html')
+        if error_rate and self._roll() < error_rate:
+            return self._send(handler, 500, b'server error', 'text/plain')
+
+        base = self.images[zlib.crc32(path.encode("utf-8")) % len(self.images)]
+        chunked = self._roll() < profile.get('chunked_rate', 0)
+        self._send(handler, 200, unique_jpeg(base, f"{host}/{path}"), 'image/jpeg', chunked=chunked)
+
+class _QuietServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Hedged downloads hang up on the losing mirrors mid-response
+        if not isinstance(sys.exc_info()[1], (ConnectionError, TimeoutError)):
+            super().handle_error(request, client_address)
+
+def offline_adapter_class(origin_port, dead_port, dead_hosts):
+    """HTTPAdapter that sends every request to the local origin instead of the internet"""
+    from requests.adapters import HTTPAdapter
+
+    class OfflineAdapter(HTTPAdapter):
+        def send(self, request, **kwargs):
+            parts = urlsplit(request.url)
+            port = dead_port if parts.hostname in dead_hosts else origin_port
+            request.url = urlunsplit(('http', f"127.0.0.1:{port}", f"/{parts.hostname}{parts.path}",
+                                      parts.query, ''))
+            return super().send(request, **kwargs)
+
+    return OfflineAdapter
+
+def generate_catalog(kind, titles, seed=1):
+    """Raw catalog records shaped like series_ready_for_db.json or the movie files"""
+    rng = random.Random(seed)
+    genres = ['Action', 'Drama', 'Comedy', 'Thriller', 'Sci-Fi', 'Animation', 'Crime']
+    records = []
+    for i in range(titles):
+        year = 1990 + rng.randrange(35)
+        slug = f"{kind}-{i}-{year}"
+        title = f"Synthetic {kind.title()} {i} ({year})"
+        category = ['Hollywood', str(year), '720p', '1080p'] + rng.sample(genres, 2)
+        featured = f"https://vegamovies.ps/wp-content/uploads/{year}/{slug}.jpg"
+        screenshots = [f"https://imgbb.top/ib/{slug}-{n}.jpg" for n in range(rng.randrange(1, 4))]
+        if kind == 'series':
+            records.append({
+                'title': title,
+                'featured_image': featured,
+                'movie_screenshots': ' '.join(f'<img src="{url}">' for url in screenshots),
+                'category': ', '.join(category),
+                'Season 1': f"{title} Season 1 |\nEpisode 1 : https://pixeldra.in/api/file/{slug}?download,720p,300 MB"
+            })
+        else:
+            records.append({
+                'title': title,
+                'featured_image': featured,
+                'image': screenshots[0],
+                'movie_screenshots': screenshots,
+                'category': category,
+                'final_links': [{'url': f"https://pixeldra.in/api/file/{slug}?download", 'quality': '720p', 'size': '900MB'}]
+            })
+    return records
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def run_one(args):
+    """Child process: one pipeline run against the origin on args.port"""
+    os.chdir(args.workdir)
+    records = generate_catalog(args.kind, args.titles, args.seed)
+    with open('input.json', 'w', encoding='utf-8') as f:
+        json.dump(records, f)
+    del records
+
+    import randomabc
+    from fake_storage import FakeBucket
+    from http_client import PooledHttpClient, set_http_client
+
+    dead_hosts = {host for host, profile in HOST_PROFILES.items() if profile.get('dead')}
+    set_http_client(PooledHttpClient(adapter_class=offline_adapter_class(args.port, args.dead_port, dead_hosts)))
+
+    bucket = FakeBucket()
+    process = randomabc.process_series_json if args.kind == 'series' else randomabc.process_movies_json
+    started = time.perf_counter()
+    process(max_workers=args.workers, image_workers=args.image_workers, bucket=bucket,
+            input_file='input.json', output_file='output.json')
+    wall = time.perf_counter() - started
+
+    with open(os.path.join('temp_images', 'run_metrics.json'), 'r', encoding='utf-8') as f:
+        metrics = json.load(f)
+    counters = metrics['counters']
+    result = {
+        'kind': args.kind,
+        'titles': args.titles,
+        'wall_seconds': round(wall, 3),
+        'titles_per_second': round(args.titles / wall, 2),
+        'images_downloaded': counters.get('downloads', 0),
+        'download_failures': counters.get('download_failures', 0),
+        'uploads': bucket.calls['upload'],
+        'bytes_downloaded': metrics['bytes'].get('downloaded', 0),
+        'peak_rss_mb': round(peak_rss_mb(), 1)
+    }
+    with open(args.result_file, 'w', encoding='utf-8') as f:
+        json.dump(result, f)
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except Exception:
+        return None
+
+def run_suite(args):
+    origin = SyntheticOrigin(latency_scale=args.latency, error_rate=args.error_rate, seed=args.seed).start()
+    results = []
+    try:
+        for kind in args.kinds:
+            for titles in args.titles:
+                with tempfile.TemporaryDirectory() as workdir:
+                    result_file = os.path.join(workdir, 'result.json')
+                    command = [sys.executable, os.path.abspath(__file__), '--run-one', '--kind', kind,
+                               '--titles', str(titles), '--workdir', workdir, '--result-file', result_file,
+                               '--port', str(origin.port), '--dead-port', str(origin.dead_port),
+                               '--workers', str(args.workers), '--image-workers', str(args.image_workers),
+                               '--seed', str(args.seed)]
+                    print(f"▶ {kind}: {titles} titles")
+                    subprocess.run(command, check=True, stdout=subprocess.DEVNULL if not args.verbose else None)
+                    with open(result_file, 'r', encoding='utf-8') as f:
+                        results.append(json.load(f))
+    finally:
+        origin.stop()
+
+    run = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'settings': {'latency_scale': args.latency, 'error_rate': args.error_rate, 'workers': args.workers,
+                     'image_workers': args.image_workers, 'seed': args.seed},
+        'results': results
+    }
+    directory = os.path.dirname(args.results_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.results_file, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(run) + '\n')
+
+    print(f"{'kind':8s} {'titles':>7s} {'wall s':>9s} {'titles/s':>9s} {'images':>7s} {'failed':>7s} {'peak MB':>8s}")
+    for r in results:
+        print(f"{r['kind']:8s} {r['titles']:7d} {r['wall_seconds']:9.2f} {r['titles_per_second']:9.2f} "
+              f"{r['images_downloaded']:7d} {r['download_failures']:7d} {r['peak_rss_mb']:8.1f}")
+    print(f"Results appended to {args.results_file}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--titles', type=int, nargs='+', default=[100, 1000], help="catalog sizes to run")
+    parser.add_argument('--kinds', nargs='+', choices=['series', 'movies'], default=['series', 'movies'])
+    parser.add_argument('--latency', type=float, default=1.0, help="multiplier for the host latencies")
+    parser.add_argument('--error-rate', type=float, default=None, help="override every host's error rate")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--image-workers', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--results-file', default=RESULTS_FILE)
+    parser.add_argument('--verbose', action='store_true', help="show the pipeline output of each run")
+    # Used by the suite to start each run in a fresh process
+    parser.add_argument('--run-one', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--kind', help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--dead-port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        args.titles = args.titles[0]
+        run_one(args)
+    else:
+        run_suite(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark placeholder generation: the old per-pixel loop against the cached
+template used by generate_placeholder_image.
+
+    python src/data/bench_placeholder.py [--count 20]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from PIL import Image, ImageDraw
+
+import randomabc
+
+def legacy_placeholder(movie_title, output_path, width=600, height=900):
+    """The original draw.point() gradient, kept here only for comparison"""
+    image = Image.new('RGB', (width, height), color=(16, 16, 24))
+    draw = ImageDraw.Draw(image)
+    for y in range(height):
+        for x in range(width):
+            noise = random.randint(-10, 10)
+            gradient = int(y / height * 40)
+            r = min(255, 16 + gradient + noise)
+            g = min(255, 16 + gradient + noise)
+            b = min(255, 24 + int(gradient * 1.5) + noise)
+            draw.point((x, y), fill=(r, g, b))
+    font = randomabc.placeholder_font()
+    draw.text((100, height // 2 - 25), movie_title[:20], font=font, fill=(255, 255, 255))
+    image.save(output_path)
+    return output_path
+
+def time_per_call(fn, count):
+    started = time.perf_counter()
+    for i in range(count):
+        fn(i)
+    return (time.perf_counter() - started) / count
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=20, help="placeholders generated per variant")
+    parser.add_argument('--legacy-count', type=int, default=3, help="placeholders generated with the old loop")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        path = lambda i: os.path.join(out_dir, f"placeholder_{i}.png")
+
+        legacy = time_per_call(lambda i: legacy_placeholder(f"Legacy Title {i}", path(i)), args.legacy_count)
+
+        randomabc.placeholder_background.cache_clear()
+        started = time.perf_counter()
+        randomabc.placeholder_background(600, 900)
+        template = time.perf_counter() - started
+
+        cached = time_per_call(
+            lambda i: randomabc.generate_placeholder_image(f"Cached Title {i}", 'featured', path(i)),
+            args.count
+        )
+
+    print(f"legacy per-pixel loop : {legacy * 1000:9.1f} ms/placeholder")
+    print(f"template build (once) : {template * 1000:9.1f} ms")
+    print(f"cached template       : {cached * 1000:9.1f} ms/placeholder")
+    print(f"speedup               : {legacy / cached:9.1f}x")
+
+if __name__ == "__main__":
+    main()
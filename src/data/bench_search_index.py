@@ -0,0 +1,81 @@
+"""
+Benchmark the precomputed search index against a linear scan over the
+catalog (what a title ILIKE / Array.filter does), on a catalog built by
+repeating the real series and movie records.
+
+    python src/data/bench_search_index.py [--copies 100] [--rounds 20]
+"""
+import argparse
+import tempfile
+import time
+
+from series_normalizer import normalize_category
+from search_index import SearchIndex, build_index, fold, iter_catalog, tokenize, write_index
+
+QUERIES = [
+    ('dragon', {}),
+    ('the', {}),
+    ('like a drag', {}),
+    ('squid game', {}),
+    ('', {'year': '2024', 'category': 'Netflix'}),
+    ('man', {'quality': '1080p'}),
+    ('zzz no match', {})
+]
+
+def build_catalog(copies):
+    records = list(iter_catalog())
+    return [(kind, dict(record, title=f"{record.get('title')} {copy}")) for copy in range(copies) for kind, record in records]
+
+def linear_search(catalog, query, limit=20, **filters):
+    """Every record checked in turn, each query token as a title substring"""
+    tokens = tokenize(query)
+    results = []
+    for kind, record in catalog:
+        title = fold(record.get('title', ''))
+        if not all(token in title for token in tokens):
+            continue
+        categories = normalize_category(record.get('category'))
+        if filters and not all(value in categories or value in title for value in filters.values()):
+            continue
+        results.append(record)
+        if len(results) >= limit:
+            break
+    return results
+
+def time_queries(fn, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for query, filters in QUERIES:
+            fn(query, **filters)
+    return (time.perf_counter() - started) / (rounds * len(QUERIES))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--copies', type=int, default=100, help="times the catalog is repeated")
+    parser.add_argument('--rounds', type=int, default=20, help="passes over the query set")
+    args = parser.parse_args()
+
+    catalog = build_catalog(args.copies)
+    with tempfile.TemporaryDirectory() as output_dir:
+        started = time.perf_counter()
+        docs, terms, facets = build_index(catalog)
+        manifest = write_index(docs, terms, facets, output_dir)
+        build_seconds = time.perf_counter() - started
+
+        index = SearchIndex(output_dir)
+        # Load every shard up front so only lookups are timed
+        for key in manifest['shards']:
+            index.shard(key)
+        indexed = time_queries(lambda q, **f: index.search(q, **f), args.rounds)
+        # Unlimited scans match the indexed search, which always intersects whole lists
+        scan = time_queries(lambda q, **f: linear_search(catalog, q, limit=len(catalog), **f), args.rounds)
+
+    print(f"catalog      : {len(catalog)} titles, {len(terms)} tokens, {len(manifest['shards'])} shards, "
+          f"{manifest['bytes'] / 1024:.0f} KB")
+    print(f"index build  : {build_seconds:8.2f} s")
+    print(f"indexed query: {indexed * 1e6:8.0f} us/query")
+    print(f"linear scan  : {scan * 1e6:8.0f} us/query")
+    print(f"speedup      : {scan / indexed:8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Export a processed catalog (series.json or a movie file) as static files the
+frontend can page through instead of fetching the whole document:
+
+    <output_dir>/manifest.json          file list with content hashes and sizes
+    <output_dir>/summary.json           every title without links or episodes
+    <output_dir>/pages/page-0001.json   full records, PAGE_SIZE per page
+    <output_dir>/details/<id>.json      one full record per title
+
+Every file also gets a .gz (and, when the brotli package is installed, a .br)
+version next to it. Files whose content hash matches the previous manifest
+are left alone, so a re-export only rewrites and recompresses what changed.
+
+    python src/data/catalog_export.py src/data/series.json public/catalog/series
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from json_stream import iter_json_array
+from change_detection import iter_with_ids
+
+PAGE_SIZE = 50
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+# Fields only shipped in pages and detail files
+DETAIL_FIELDS = {'seasons', 'final_links', 'movie_screenshots', 'screenshot_variants'}
+
+def summarize(record, rid, detail_file):
+    """List entry for a record: everything but links, with season/episode counts"""
+    summary = {'id': rid}
+    summary.update((key, value) for key, value in record.items() if key not in DETAIL_FIELDS)
+    summary['detail'] = detail_file
+    seasons = record.get('seasons')
+    if isinstance(seasons, list):
+        summary['season_count'] = len(seasons)
+        summary['episode_count'] = sum(len(season.get('episodes') or []) for season in seasons)
+    return summary
+
+def encode(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def _write_atomic(path, payload):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+class CatalogExporter:
+    """Writes files under output_dir, skipping the ones whose content is unchanged"""
+
+    def __init__(self, output_dir, previous=None):
+        self.output_dir = output_dir
+        self.previous = previous or {}
+        self.entries = {}
+        self.written = 0
+        self.unchanged = 0
+
+    def write(self, name, data):
+        payload = encode(data)
+        sha256 = hashlib.sha256(payload).hexdigest()
+        path = os.path.join(self.output_dir, name)
+        old = self.previous.get(name)
+        compressed_as_before = old and (brotli is None or 'br_bytes' in old)
+        if compressed_as_before and old['sha256'] == sha256 and os.path.exists(path):
+            self.entries[name] = old
+            self.unchanged += 1
+            return old
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _write_atomic(path, payload)
+        # mtime=0 keeps the .gz bytes identical for identical content
+        gzipped = gzip.compress(payload, compresslevel=GZIP_LEVEL, mtime=0)
+        _write_atomic(path + '.gz', gzipped)
+        entry = {'sha256': sha256, 'bytes': len(payload), 'gzip_bytes': len(gzipped)}
+        if brotli is not None:
+            compressed = brotli.compress(payload, quality=BROTLI_QUALITY)
+            _write_atomic(path + '.br', compressed)
+            entry['br_bytes'] = len(compressed)
+        elif os.path.exists(path + '.br'):
+            # A stale .br would no longer match the file next to it
+            os.remove(path + '.br')
+        self.entries[name] = entry
+        self.written += 1
+        return entry
+
+    def remove_stale(self):
+        """Delete files from the previous export that are no longer listed"""
+        removed = 0
+        for name in set(self.previous) - set(self.entries):
+            for suffix in ('', '.gz', '.br'):
+                path = os.path.join(self.output_dir, name + suffix)
+                if os.path.exists(path):
+                    os.remove(path)
+            removed += 1
+        return removed
+
+def load_export_manifest(output_dir):
+    """Return {file name: entry} from the previous export, or {}"""
+    path = os.path.join(output_dir, 'manifest.json')
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('files', {})
+    except Exception as e:
+        print(f"Ignoring unreadable export manifest {path}: {str(e)}")
+        return {}
+
+def export_catalog(catalog_file, output_dir, kind=None, page_size=PAGE_SIZE):
+    """Write pages, summary, details and manifest for catalog_file; returns the manifest"""
+    exporter = CatalogExporter(output_dir, load_export_manifest(output_dir))
+    summaries = []
+    pages = []
+    details = {}
+    page = []
+
+    def flush_page():
+        name = f"pages/page-{len(pages) + 1:04d}.json"
+        exporter.write(name, page)
+        pages.append({'file': name, 'count': len(page)})
+
+    for i, rid, record in iter_with_ids(iter_json_array(catalog_file)):
+        name = f"details/{rid}.json"
+        summaries.append(summarize(record, rid, name))
+        exporter.write(name, dict(record, id=record.get('id', rid)))
+        details[rid] = name
+        page.append(record)
+        if len(page) >= page_size:
+            flush_page()
+            page = []
+    if page:
+        flush_page()
+    exporter.write('summary.json', summaries)
+    removed = exporter.remove_stale()
+
+    manifest = {
+        'kind': kind,
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'total': len(summaries),
+        'page_size': page_size,
+        'summary': 'summary.json',
+        'pages': pages,
+        'details': details,
+        'files': exporter.entries
+    }
+    _write_atomic(os.path.join(output_dir, 'manifest.json'), json.dumps(manifest, indent=2).encode('utf-8'))
+
+    print(f"📦 Exported {len(summaries)} {kind or 'records'} to {output_dir}: {len(pages)} pages, "
+          f"{exporter.written} files written, {exporter.unchanged} unchanged, {removed} removed")
+    if brotli is None:
+        print("Brotli package not installed, only .gz versions were written")
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('catalog')
+    parser.add_argument('output_dir')
+    parser.add_argument('--kind', default=None)
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE)
+    args = parser.parse_args()
+    export_catalog(args.catalog, args.output_dir, args.kind, args.page_size)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Fingerprints of catalog records, so a run can tell which input records are
+new or changed since the previous run and carry the rest over unchanged.
+"""
+import hashlib
+import json
+import os
+
+def record_id(record, i=0):
+    """Stable ID of a record: its title slug, or its position when it has no title"""
+    title = str(record.get('title') or '')
+    slug = ''.join(c for c in title if c.isalnum() or c.isspace()).strip().replace(' ', '_').lower()
+    return slug or f"untitled_{i}"
+
+def iter_with_ids(records):
+    """
+    Yield (i, record_id, record), numbering repeated titles (silo, silo~2, ...)
+    so every record keeps the same ID from run to run.
+    """
+    seen = {}
+    for i, record in enumerate(records):
+        rid = record_id(record, i)
+        seen[rid] = seen.get(rid, 0) + 1
+        if seen[rid] > 1:
+            rid = f"{rid}~{seen[rid]}"
+        yield i, rid, record
+
+def record_fingerprint(record):
+    """Content hash of an input record, independent of key order"""
+    canonical = json.dumps(record, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def load_manifest(path):
+    """Return {record_id: fingerprint} from the previous run, or {}"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Ignoring unreadable manifest {path}: {str(e)}")
+        return {}
+
+def save_manifest(path, fingerprints):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(fingerprints, f, indent=0, sort_keys=True)
+    os.replace(tmp_path, path)
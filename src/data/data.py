@@ -1,23 +1,106 @@
-import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 import firebase_admin
 from firebase_admin import credentials, firestore
 
-# Initialize Firebase Admin SDK
-cred = credentials.Certificate("src/data/goforcab-941-6b32cb292fcf.json")  # Replace with your key path
-firebase_admin.initialize_app(cred)
+from change_detection import iter_with_ids
+from json_stream import iter_json_array
+
+# Firestore accepts at most 500 writes per batch
+BATCH_SIZE = 500
+# Number of batches committing at the same time
+MAX_IN_FLIGHT = 4
+# Attempts per batch before giving up on it
+MAX_RETRIES = 5
+
+def iter_batches(movies, batch_size=BATCH_SIZE):
+    """
+    Group (doc_id, movie) pairs into batches. Documents are keyed by the same
+    record IDs as the image pipeline (silo, silo~2), so re-runs overwrite
+    instead of duplicating and movies sharing a title stay separate documents.
+    """
+    batch = []
+    for i, doc_id, movie in iter_with_ids(movies):
+        batch.append((doc_id, movie))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def commit_batch(db, collection_name, docs, max_retries=MAX_RETRIES):
+    """Commit one batch of upserts, retrying with exponential backoff"""
+    collection = db.collection(collection_name)
+    for attempt in range(1, max_retries + 1):
+        try:
+            batch = db.batch()
+            for doc_id, movie in docs:
+                batch.set(collection.document(doc_id), movie)
+            batch.commit()
+            return len(docs)
+        except Exception as e:
+            if attempt == max_retries:
+                print(f"❌ Batch of {len(docs)} documents failed after {attempt} attempts: {str(e)}")
+                return 0
+            delay = min(30, 0.5 * 2 ** (attempt - 1))
+            print(f"Batch commit failed ({str(e)}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+def upload_movies(db, movies, collection_name="movies", batch_size=BATCH_SIZE, max_in_flight=MAX_IN_FLIGHT):
+    """
+    Upsert movies into Firestore in batched commits with at most max_in_flight
+    batches outstanding. Works with the Firestore emulator (set
+    FIRESTORE_EMULATOR_HOST) or any object with the same collection/batch API.
+    """
+    started = time.monotonic()
+    written = 0
+    failed = 0
+    pending = deque()
+
+    def collect(future, size):
+        nonlocal written, failed
+        committed = future.result()
+        written += committed
+        failed += size - committed
+        elapsed = time.monotonic() - started
+        print(f"Committed {written} documents ({written / elapsed:.0f} docs/s)")
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        for docs in iter_batches(movies, batch_size):
+            pending.append((pool.submit(commit_batch, db, collection_name, docs), len(docs)))
+            if len(pending) >= max_in_flight:
+                collect(*pending.popleft())
+        while pending:
+            collect(*pending.popleft())
+
+    elapsed = time.monotonic() - started
+    rate = written / elapsed if elapsed else 0
+    print(f"✅ Upserted {written} documents into '{collection_name}' in {elapsed:.1f}s ({rate:.0f} docs/s)")
+    if failed:
+        print(f"⚠️ {failed} documents were not written")
+    return {'written': written, 'failed': failed, 'seconds': elapsed, 'docs_per_second': rate}
 
-# Connect to Firestore
-db = firestore.client()
+if __name__ == "__main__":
+    if os.environ.get('FIRESTORE_EMULATOR_HOST'):
+        # The emulator doesn't check credentials
+        from google.cloud import firestore as cloud_firestore
+        db = cloud_firestore.Client(project=os.environ.get('GCLOUD_PROJECT', 'goforcab-941'))
+    else:
+        # Initialize Firebase Admin SDK
+        cred = credentials.Certificate("src/data/goforcab-941-6b32cb292fcf.json")  # Replace with your key path
+        firebase_admin.initialize_app(cred)
 
-# Load the movie data JSON file
-with open("src/data/enhanced_movies.json", "r") as file:  # Ensure the JSON file is in the same directory
-    movies = json.load(file)
+        # Connect to Firestore
+        db = firestore.client()
 
-# Upload each movie to Firestore
-collection_name = "movies"  # Firestore collection where data will be stored
+    # Stream the movie data JSON file instead of loading it whole
+    movies = iter_json_array("src/data/enhanced_movies.json")
 
-for movie in movies:
-    doc_ref = db.collection(collection_name).document()  # Auto-generate document ID
-    doc_ref.set(movie)
+    # Upload the movies in batches
+    collection_name = "movies"  # Firestore collection where data will be stored
+    upload_movies(db, movies, collection_name)
 
-print("Movies data successfully uploaded to Firestore!")
+    print("Movies data successfully uploaded to Firestore!")
@@ -0,0 +1,92 @@
+"""
+In-memory stand-in for the parts of the firebase_admin storage.bucket() API
+the pipeline uses, for dry runs and benchmarks without touching Firebase.
+
+    bucket = FakeBucket()
+    process_series_json(bucket=bucket)
+    print(bucket.calls)
+"""
+import base64
+import hashlib
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+
+class FakeBlob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.data = None
+        self.md5_hash = None
+        self.content_type = None
+        self.cache_control = None
+        self.public = False
+        self.time_created = None
+
+    @property
+    def public_url(self):
+        return f"https://storage.googleapis.com/{self.bucket.name}/{self.name}"
+
+    def upload_from_filename(self, filename, content_type=None):
+        with open(filename, 'rb') as f:
+            data = f.read()
+        self.bucket._count('upload')
+        self.data = data
+        self.time_created = datetime.now(timezone.utc)
+        self.md5_hash = base64.b64encode(hashlib.md5(data).digest()).decode('ascii')
+        if content_type:
+            self.content_type = content_type
+        self.bucket._store(self)
+
+    def make_public(self):
+        self.bucket._count('make_public')
+        self.public = True
+
+    def patch(self):
+        self.bucket._count('patch')
+
+    def reload(self):
+        self.bucket._count('reload')
+        if self.name not in self.bucket.blobs:
+            raise LookupError(f"No such object: {self.bucket.name}/{self.name}")
+
+    def exists(self):
+        self.bucket._count('exists')
+        return self.name in self.bucket.blobs
+
+    def delete(self):
+        self.bucket._count('delete')
+        self.bucket.blobs.pop(self.name, None)
+
+class FakeBucket:
+    """Keeps objects in a dict and counts every API call that would hit the network"""
+
+    def __init__(self, name="fake-bucket.appspot.com"):
+        self.name = name
+        self.blobs = {}
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def _count(self, call):
+        with self._lock:
+            self.calls[call] += 1
+
+    def _store(self, blob):
+        with self._lock:
+            self.blobs[blob.name] = blob
+
+    def blob(self, name):
+        # Like the real client, this only builds a local handle
+        return self.blobs.get(name) or FakeBlob(self, name)
+
+    def get_blob(self, name):
+        self._count('get_blob')
+        return self.blobs.get(name)
+
+    def list_blobs(self, prefix=None):
+        self._count('list_blobs')
+        return [blob for name, blob in list(self.blobs.items()) if not prefix or name.startswith(prefix)]
+
+    def exists(self):
+        self._count('bucket_exists')
+        return True
@@ -0,0 +1,119 @@
+"""
+Connect to the project's Firebase Storage bucket. The bucket name that
+worked (<project>.appspot.com or <project>.firebasestorage.app) is cached in
+BUCKET_CACHE_FILE, so later runs go straight to it. The connectivity check is
+a single bucket metadata read instead of a test upload, and can be skipped.
+
+firebase_admin is only imported when a connection is actually made.
+"""
+import json
+import os
+
+CRED_PATH = "src/data/goforcab-941-2bbc38a80938.json"
+BUCKET_CACHE_FILE = os.path.join('temp_images', 'bucket_name.json')
+DEFAULT_PROJECT_ID = 'goforcab-941'
+
+_bucket = None
+
+def candidate_bucket_names(project_id):
+    return [f"{project_id}.appspot.com", f"{project_id}.firebasestorage.app"]
+
+def load_cached_bucket_name(project_id, cache_file=BUCKET_CACHE_FILE):
+    if not os.path.exists(cache_file):
+        return None
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f).get(project_id)
+    except Exception as e:
+        print(f"Ignoring unreadable bucket cache {cache_file}: {str(e)}")
+        return None
+
+def save_cached_bucket_name(project_id, bucket_name, cache_file=BUCKET_CACHE_FILE):
+    cached = {}
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except Exception:
+            cached = {}
+    cached[project_id] = bucket_name
+    directory = os.path.dirname(cache_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(cache_file, 'w', encoding='utf-8') as f:
+        json.dump(cached, f, indent=2)
+
+def bucket_is_reachable(bucket):
+    """One metadata read: does the bucket exist and do these credentials work?"""
+    try:
+        return bucket.exists()
+    except Exception as e:
+        # Keys without storage.buckets.get can still list objects
+        if '403' not in str(e):
+            raise
+        next(iter(bucket.list_blobs(max_results=1)), None)
+        return True
+
+def _firebase_app(cred_path):
+    """Initialize the Firebase app once per process and reuse it afterwards"""
+    import firebase_admin
+    from firebase_admin import credentials
+
+    try:
+        return firebase_admin.get_app()
+    except ValueError:
+        return firebase_admin.initialize_app(credentials.Certificate(cred_path))
+
+def _print_key_help(error, cred_path):
+    if "invalid_grant" in str(error):
+        print("\n🔑 SOLUTION: Your service account key has expired. Follow these steps:")
+        print("1. Go to the Firebase Console (https://console.firebase.google.com/)")
+        print("2. Select your project")
+        print("3. Go to Project Settings > Service accounts")
+        print("4. Click 'Generate new private key'")
+        print("5. Download the new key and replace the existing one at:", cred_path)
+
+def get_bucket(cred_path=CRED_PATH, verify=True, refresh=False):
+    """
+    Return the Storage bucket, or None when no bucket can be reached. With
+    verify=False a cached bucket name is trusted without any network call;
+    refresh ignores the cached name and probes the candidates again.
+    """
+    global _bucket
+    if _bucket is not None and not refresh:
+        return _bucket
+
+    if not os.path.exists(cred_path):
+        print(f"❌ ERROR: Credentials file not found at {cred_path}")
+        return None
+    with open(cred_path, 'r') as file:
+        project_id = json.load(file).get('project_id', DEFAULT_PROJECT_ID)
+
+    try:
+        from firebase_admin import storage
+        app = _firebase_app(cred_path)
+
+        cached_name = None if refresh else load_cached_bucket_name(project_id)
+        if cached_name:
+            bucket = storage.bucket(cached_name, app=app)
+            if not verify or bucket_is_reachable(bucket):
+                print(f"✅ Connected to bucket: {cached_name}")
+                _bucket = bucket
+                return bucket
+            print(f"Cached bucket {cached_name} is not reachable, trying the alternatives")
+
+        for bucket_name in candidate_bucket_names(project_id):
+            bucket = storage.bucket(bucket_name, app=app)
+            if bucket_is_reachable(bucket):
+                save_cached_bucket_name(project_id, bucket_name)
+                print(f"✅ Connected to bucket: {bucket_name}")
+                _bucket = bucket
+                return bucket
+            print(f"Bucket {bucket_name} does not exist")
+
+        print(f"❌ ERROR: None of the buckets for project {project_id} exist")
+        return None
+    except Exception as e:
+        print(f"❌ ERROR: Failed to connect to Firebase Storage: {str(e)}")
+        _print_key_help(e, cred_path)
+        return None
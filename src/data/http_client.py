@@ -0,0 +1,133 @@
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
+    'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Referer': 'https://www.google.com/'
+}
+
+# Number of hosts that keep their own connection pool
+POOL_HOSTS = 32
+# Number of keep-alive connections kept open per host
+POOL_SIZE_PER_HOST = 8
+# Maximum number of requests in flight per domain
+MAX_PER_DOMAIN = 4
+
+class PooledHttpClient:
+    """Long-lived HTTP client with per-host keep-alive pools and per-domain concurrency caps"""
+
+    def __init__(self, max_per_domain=MAX_PER_DOMAIN, pool_hosts=POOL_HOSTS, pool_size=POOL_SIZE_PER_HOST, headers=None,
+                 adapter_class=HTTPAdapter):
+        self.max_per_domain = max_per_domain
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        # pool_block keeps us at pool_size open sockets per host instead of opening throwaway ones
+        self.adapter = adapter_class(pool_connections=pool_hosts, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+        self._lock = threading.Lock()
+        self._domain_slots = {}
+        self._retired_stats = {'requests': 0, 'new_connections': 0}
+        # Keep the counters of host pools that get evicted from the pool manager
+        pools = self.adapter.poolmanager.pools
+        dispose = pools.dispose_func
+
+        def retire(pool):
+            with self._lock:
+                self._retired_stats['requests'] += pool.num_requests
+                self._retired_stats['new_connections'] += pool.num_connections
+            dispose(pool)
+
+        pools.dispose_func = retire
+
+    def _slot(self, domain):
+        with self._lock:
+            slot = self._domain_slots.get(domain)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_per_domain)
+                self._domain_slots[domain] = slot
+            return slot
+
+    @contextmanager
+    def domain_slot(self, url):
+        """Hold one of the concurrency slots of the URL's domain"""
+        slot = self._slot(urlparse(url).netloc)
+        with slot:
+            yield
+
+    def get(self, url, **kwargs):
+        """GET a URL through the shared pools, waiting for a free slot on its domain"""
+        with self.domain_slot(url):
+            return self.session.get(url, **kwargs)
+
+    @contextmanager
+    def stream(self, url, **kwargs):
+        """Stream a GET response while holding the domain slot until the body has been read"""
+        with self.domain_slot(url):
+            response = self.session.get(url, stream=True, **kwargs)
+            try:
+                yield response
+            finally:
+                response.close()
+
+    def head(self, url, **kwargs):
+        """HEAD a URL through the shared pools, waiting for a free slot on its domain"""
+        with self.domain_slot(url):
+            return self.session.head(url, **kwargs)
+
+    def connection_stats(self):
+        """Return how many requests reused a pooled connection versus opened a new one"""
+        total_requests = self._retired_stats['requests']
+        new_connections = self._retired_stats['new_connections']
+        per_host = {}
+        # urllib3 keeps num_requests/num_connections on every host pool
+        for key in list(self.adapter.poolmanager.pools.keys()):
+            pool = self.adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            total_requests += pool.num_requests
+            new_connections += pool.num_connections
+            per_host[pool.host] = {
+                'requests': pool.num_requests,
+                'new_connections': pool.num_connections,
+                'reused_connections': max(0, pool.num_requests - pool.num_connections)
+            }
+        return {
+            'requests': total_requests,
+            'new_connections': new_connections,
+            'reused_connections': max(0, total_requests - new_connections),
+            'hosts': per_host
+        }
+
+    def close(self):
+        self.session.close()
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_http_client():
+    """Return the HTTP client shared by every download in this run"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = PooledHttpClient()
+        return _client
+
+def set_http_client(client):
+    """Replace the shared client, e.g. with one whose adapter talks to a local test origin"""
+    global _client
+    with _client_lock:
+        _client = client
+
+def print_connection_stats(client=None):
+    """Print connection reuse counters of the shared client"""
+    stats = (client or get_http_client()).connection_stats()
+    print(f"🔌 HTTP connections: {stats['requests']} requests, "
+          f"{stats['reused_connections']} reused, {stats['new_connections']} new")
+    return stats
@@ -0,0 +1,180 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+from PIL import Image
+
+CACHE_DIR = os.path.join('temp_images', 'cas')
+INDEX_FILE = os.path.join('temp_images', 'image_index.sqlite')
+# Evict least recently used images once the cache grows past this size
+MAX_CACHE_BYTES = 2 * 1024 * 1024 * 1024
+# Images looked up or stored this recently are never evicted, since a worker may still be uploading them
+EVICT_GRACE_SECONDS = 15 * 60
+
+FORMAT_EXTENSIONS = {
+    'JPEG': '.jpg',
+    'PNG': '.png',
+    'GIF': '.gif',
+    'WEBP': '.webp',
+    'AVIF': '.avif'
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    format TEXT,
+    width INTEGER,
+    height INTEGER,
+    last_access REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL REFERENCES blobs(sha256) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS blobs_last_access ON blobs(last_access);
+"""
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ImageCache:
+    """
+    Content-addressed store for downloaded images. Files live under
+    CACHE_DIR/<sha[:2]>/<sha><ext>. A SQLite index maps source URLs to
+    content hashes and keeps the verified size, format and dimensions of
+    each file, so a cache hit is one index lookup.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, index_file=INDEX_FILE, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        index_dir = os.path.dirname(index_file)
+        if index_dir:
+            os.makedirs(index_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(index_file, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+        self._total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def lookup(self, url):
+        """Return the cached entry for a source URL, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT b.sha256, b.path, b.size, b.format, b.width, b.height "
+                "FROM urls u JOIN blobs b ON b.sha256 = u.sha256 WHERE u.url = ?",
+                (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            if not os.path.exists(row[1]):
+                # The file was deleted behind the index's back: forget it and download again
+                self._db.execute("DELETE FROM blobs WHERE sha256 = ?", (row[0],))
+                self._db.commit()
+                self._total_bytes -= row[2]
+                return None
+            self._db.execute("UPDATE blobs SET last_access = ? WHERE sha256 = ?", (time.time(), row[0]))
+            self._db.commit()
+        return dict(zip(('sha256', 'path', 'size', 'format', 'width', 'height'), row))
+
+    def store(self, url, downloaded_path, info=None, sha256=None):
+        """
+        Move a freshly downloaded file into the store under its content hash.
+        info holds the format/width/height the downloader already verified;
+        without it the file is verified here. Returns the cached entry, or
+        None if it isn't an image.
+        """
+        if info is None:
+            try:
+                with Image.open(downloaded_path) as img:
+                    info = {'format': img.format, 'width': img.size[0], 'height': img.size[1]}
+                    img.verify()
+            except Exception as e:
+                print(f"Not caching invalid image {downloaded_path}: {str(e)}")
+                os.remove(downloaded_path)
+                return None
+        image_format, width, height = info['format'], info['width'], info['height']
+
+        sha256 = sha256 or file_sha256(downloaded_path)
+        size = os.path.getsize(downloaded_path)
+        extension = FORMAT_EXTENSIONS.get(image_format, os.path.splitext(downloaded_path)[1] or '.img')
+        path = os.path.join(self.cache_dir, sha256[:2], f"{sha256}{extension}")
+
+        with self._lock:
+            if os.path.exists(path):
+                # Same bytes already cached for another URL or title
+                os.remove(downloaded_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                shutil.move(downloaded_path, path)
+            known = self._db.execute("SELECT 1 FROM blobs WHERE sha256 = ?", (sha256,)).fetchone()
+            if known:
+                # Keep the row (and the URLs already pointing at it), just touch it
+                self._db.execute("UPDATE blobs SET last_access = ? WHERE sha256 = ?", (time.time(), sha256))
+            else:
+                self._db.execute(
+                    "INSERT INTO blobs (sha256, path, size, format, width, height, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (sha256, path, size, image_format, width, height, time.time())
+                )
+                self._total_bytes += size
+            self._db.execute("INSERT OR REPLACE INTO urls (url, sha256) VALUES (?, ?)", (url, sha256))
+            self._db.commit()
+
+        self.evict()
+        return {'sha256': sha256, 'path': path, 'size': size, 'format': image_format, 'width': width, 'height': height}
+
+    def total_bytes(self):
+        return self._total_bytes
+
+    def evict(self, max_bytes=None):
+        """
+        Delete least recently used images until the store fits in max_bytes.
+        Images used in the last EVICT_GRACE_SECONDS are kept, even over budget.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        removed = 0
+        with self._lock:
+            if self._total_bytes <= max_bytes:
+                return 0
+            rows = self._db.execute("SELECT sha256, path, size FROM blobs WHERE last_access < ? ORDER BY last_access",
+                                    (time.time() - EVICT_GRACE_SECONDS,))
+            for sha256, path, size in rows.fetchall():
+                if self._total_bytes <= max_bytes:
+                    break
+                if os.path.exists(path):
+                    os.remove(path)
+                self._db.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+                self._total_bytes -= size
+                removed += 1
+            self._db.commit()
+        if removed:
+            print(f"🧹 Evicted {removed} images from the local image cache")
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_image_cache():
+    """Return the image cache shared by every download in this run"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ImageCache()
+        return _cache
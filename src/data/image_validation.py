@@ -0,0 +1,144 @@
+import hashlib
+import io
+
+from PIL import Image
+
+# Smallest and largest responses we accept as an image
+MIN_IMAGE_BYTES = 1000
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+# Give up if the image header can't be parsed from this many leading bytes
+HEADER_LIMIT = 64 * 1024
+
+class InvalidImage(Exception):
+    """Raised as soon as a response can be told apart from a usable image"""
+
+def sniff_format(head):
+    """Return the image format from the magic bytes, or None"""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'JPEG'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'PNG'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'GIF'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'WEBP'
+    if head[4:12] in (b'ftypavif', b'ftypavis'):
+        return 'AVIF'
+    return None
+
+def looks_complete(image_format, tail, total):
+    """Check the trailer of formats that have one, to catch truncated downloads"""
+    if image_format == 'JPEG':
+        # Some encoders append padding after the EOI marker
+        return b'\xff\xd9' in tail[-32:]
+    if image_format == 'PNG':
+        return b'IEND' in tail[-16:]
+    if image_format == 'GIF':
+        return tail.rstrip(b'\x00').endswith(b'\x3b')
+    return True
+
+def webp_dimensions(head):
+    """
+    Canvas size from the first chunk of a RIFF/WEBP file, or None if the head
+    is too short. Pillow only opens complete WebP files, so the chunk header
+    is read directly.
+    """
+    if len(head) < 30:
+        return None
+    chunk = head[12:16]
+    if chunk == b'VP8X':
+        return (1 + int.from_bytes(head[24:27], 'little'), 1 + int.from_bytes(head[27:30], 'little'))
+    if chunk == b'VP8 ':
+        if head[23:26] != b'\x9d\x01\x2a':
+            raise InvalidImage("corrupt WEBP frame header")
+        return (int.from_bytes(head[26:28], 'little') & 0x3fff, int.from_bytes(head[28:30], 'little') & 0x3fff)
+    if chunk == b'VP8L':
+        if head[20] != 0x2f:
+            raise InvalidImage("corrupt WEBP lossless header")
+        bits = int.from_bytes(head[21:25], 'little')
+        return (1 + (bits & 0x3fff), 1 + ((bits >> 14) & 0x3fff))
+    raise InvalidImage(f"unknown WEBP chunk {chunk!r}")
+
+def avif_dimensions(head):
+    """Image size from the 'ispe' property box of an AVIF file, or None if it isn't in head yet"""
+    at = head.find(b'ispe')
+    if at < 0 or len(head) < at + 16:
+        return None
+    # Box type, then version/flags, then 32-bit width and height
+    return (int.from_bytes(head[at + 8:at + 12], 'big'), int.from_bytes(head[at + 12:at + 16], 'big'))
+
+# Formats whose size is read from their own header instead of a partial Image.open
+HEADER_READERS = {'WEBP': webp_dimensions, 'AVIF': avif_dimensions}
+
+class StreamingImageValidator:
+    """
+    Validate an image while it downloads. The magic bytes are checked on the
+    first chunk and the header is parsed from the first few KB, so HTML pages
+    and other non-images are rejected before the body is fetched. The body is
+    hashed on the fly, so the caller never has to read the file again.
+    """
+
+    def __init__(self, content_length=None, max_bytes=MAX_IMAGE_BYTES, min_bytes=MIN_IMAGE_BYTES):
+        self.content_length = content_length
+        self.max_bytes = max_bytes
+        self.min_bytes = min_bytes
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+        self.format = None
+        self.dimensions = None
+        self._head = b''
+        self._tail = b''
+        if content_length is not None:
+            if content_length < min_bytes:
+                raise InvalidImage(f"too small ({content_length} bytes)")
+            if content_length > max_bytes:
+                raise InvalidImage(f"too large ({content_length} bytes)")
+
+    def feed(self, chunk):
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise InvalidImage(f"larger than {self.max_bytes} bytes")
+        self.sha256.update(chunk)
+        self._tail = (self._tail + chunk)[-64:]
+        if self.dimensions is None:
+            self._parse_header(chunk)
+
+    def _parse_header(self, chunk):
+        self._head += chunk
+        if self.format is None:
+            if len(self._head) < 12:
+                return
+            self.format = sniff_format(self._head)
+            if self.format is None:
+                raise InvalidImage(f"not an image (starts with {self._head[:12]!r})")
+        reader = HEADER_READERS.get(self.format)
+        if reader:
+            self.dimensions = reader(self._head)
+        else:
+            try:
+                with Image.open(io.BytesIO(self._head)) as img:
+                    self.dimensions = img.size
+            except Exception:
+                pass
+        if self.dimensions is not None:
+            self._head = b''
+        elif len(self._head) >= HEADER_LIMIT:
+            raise InvalidImage(f"no readable {self.format} header in the first {HEADER_LIMIT} bytes")
+
+    def finish(self):
+        """Check the complete body and return its info {format, width, height, size, sha256}"""
+        if self.size < self.min_bytes:
+            raise InvalidImage(f"too small ({self.size} bytes)")
+        if self.content_length is not None and self.size != self.content_length:
+            raise InvalidImage(f"truncated ({self.size} of {self.content_length} bytes)")
+        if self.dimensions is None:
+            raise InvalidImage(f"no readable {self.format or 'image'} header")
+        if not looks_complete(self.format, self._tail, self.size):
+            raise InvalidImage(f"truncated {self.format} data")
+        return {
+            'format': self.format,
+            'width': self.dimensions[0],
+            'height': self.dimensions[1],
+            'size': self.size,
+            'sha256': self.sha256.hexdigest()
+        }
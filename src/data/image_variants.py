@@ -0,0 +1,59 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+VARIANTS_DIR = os.path.join('temp_images', 'variants')
+# Widths the frontend needs: list thumbnails, cards and the detail page
+VARIANT_WIDTHS = (('thumb', 160), ('card', 342), ('full', 780))
+WEBP_QUALITY = 80
+
+def transcode_variants(src_path, out_dir=VARIANTS_DIR, widths=VARIANT_WIDTHS, quality=WEBP_QUALITY):
+    """
+    Write resized WebP copies of an image, one per (name, width), never
+    upscaling. Runs in a worker process; returns [{name, path, width, height}].
+    Variants already on disk for the same source file are reused.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(src_path))[0]
+    variants = []
+    with Image.open(src_path) as img:
+        img.load()
+        # WebP keeps alpha, everything else becomes plain RGB
+        if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+            img = img.convert('RGBA')
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+        for name, target_width in widths:
+            width = min(target_width, img.width)
+            height = max(1, round(img.height * width / img.width))
+            path = os.path.join(out_dir, f"{stem}_{name}.webp")
+            if not os.path.exists(path):
+                resized = img if width == img.width else img.resize((width, height), Image.LANCZOS)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                resized.save(tmp_path, 'WEBP', quality=quality, method=4)
+                os.replace(tmp_path, path)
+            variants.append({'name': name, 'path': path, 'width': width, 'height': height})
+    return variants
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_transcode_pool():
+    """Process pool for Pillow encoding, which is CPU-bound and holds the GIL"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, because forking a process full of download threads can deadlock
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 2,
+                                        mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+def shutdown_transcode_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
@@ -0,0 +1,164 @@
+"""
+Content-hashed storage paths for uploaded images. An object's path contains
+a hash of its bytes (movie_images/<slug>/featured.<hash>.jpg), so it never
+changes once written and can be served with a year-long immutable
+Cache-Control. Newer versions of an image get new paths; the old objects are
+removed later by a separate sweep.
+
+    python src/data/immutable_storage.py rewrite src/data/series.json
+    python src/data/immutable_storage.py sweep [--catalog FILE ...] [--delete]
+"""
+import argparse
+import mimetypes
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from urllib.parse import unquote
+
+from image_cache import file_sha256
+from json_stream import iter_json_array, detect_wrapper_key, JsonArrayWriter
+from upload_manifest import get_upload_manifest
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Hex digits of the SHA-256 kept in object paths
+HASH_LENGTH = 16
+STORAGE_PREFIX = "movie_images/"
+# Objects younger than this are never swept, so a run in progress keeps its uploads
+MIN_AGE_HOURS = 24
+
+URL_RE = re.compile(r'https?://[^\s"\'<>]+')
+
+mimetypes.add_type('image/webp', '.webp')
+mimetypes.add_type('image/avif', '.avif')
+
+def content_type_for(path):
+    return mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+def immutable_path(storage_path, local_path):
+    """movie_images/x/featured.jpg -> movie_images/x/featured.<hash>.jpg"""
+    root, extension = os.path.splitext(storage_path)
+    return f"{root}.{file_sha256(local_path)[:HASH_LENGTH]}{extension}"
+
+def rewrite_urls(value, url_map):
+    """Replace every URL in url_map found in a record, including inside HTML strings"""
+    if not url_map:
+        return value
+    if isinstance(value, str):
+        if value in url_map:
+            return url_map[value]
+        if '://' in value:
+            return URL_RE.sub(lambda match: url_map.get(match.group(0), match.group(0)), value)
+        return value
+    if isinstance(value, list):
+        return [rewrite_urls(item, url_map) for item in value]
+    if isinstance(value, dict):
+        return {key: rewrite_urls(item, url_map) for key, item in value.items()}
+    return value
+
+def rewrite_catalog(catalog_file, url_map):
+    """Rewrite fixed-path image URLs in a catalog file in place; returns the records changed"""
+    changed = 0
+    with JsonArrayWriter(catalog_file, wrapper_key=detect_wrapper_key(catalog_file)) as writer:
+        for record in iter_json_array(catalog_file):
+            updated = rewrite_urls(record, url_map)
+            if updated != record:
+                changed += 1
+            writer.write(updated)
+    print(f"✅ Rewrote image URLs in {changed} of {writer.count} records in {catalog_file}")
+    return changed
+
+def _iter_strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, list):
+        for item in value:
+            yield from _iter_strings(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _iter_strings(item)
+
+def referenced_paths(catalog_files, bucket_name):
+    """Object paths in the bucket that the given catalogs link to"""
+    base = f"https://storage.googleapis.com/{bucket_name}/"
+    paths = set()
+    for catalog_file in catalog_files:
+        for record in iter_json_array(catalog_file):
+            for text in _iter_strings(record):
+                for url in URL_RE.findall(text):
+                    if url.startswith(base):
+                        paths.add(unquote(url[len(base):]))
+    return paths
+
+def current_paths(manifest, bucket_name):
+    """Latest content-hashed path of every image in the upload manifest"""
+    base = f"https://storage.googleapis.com/{bucket_name}/"
+    return {unquote(url[len(base):]) for url in manifest.alias_urls().values() if url.startswith(base)}
+
+def sweep(bucket, manifest=None, catalog_files=None, prefix=STORAGE_PREFIX, delete=False,
+          min_age_hours=MIN_AGE_HOURS):
+    """
+    Find objects under prefix that are neither the current version of an
+    image in the upload manifest nor linked from one of catalog_files, and
+    delete them when delete is set. Returns the stale paths.
+
+    Without catalog_files only objects this manifest uploaded are candidates:
+    anything uploaded before the manifest existed may still be linked from a
+    catalog, so it is kept.
+    """
+    manifest = manifest or get_upload_manifest()
+    keep = current_paths(manifest, bucket.name)
+    if catalog_files:
+        keep |= referenced_paths(catalog_files, bucket.name)
+    else:
+        # Without catalogs to check, fixed-path uploads may still be in use
+        keep |= {path for path in manifest.paths() if not manifest.get(path).get('alias_url')}
+
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=min_age_hours)
+    stale = []
+    for blob in bucket.list_blobs(prefix=prefix):
+        if blob.name in keep or (not catalog_files and manifest.get(blob.name) is None):
+            continue
+        created = getattr(blob, 'time_created', None)
+        if created is not None and created > cutoff:
+            continue
+        stale.append(blob.name)
+        if delete:
+            blob.delete()
+            manifest.forget(blob.name)
+
+    if delete:
+        manifest.save()
+        print(f"🧹 Deleted {len(stale)} stale objects under {prefix}")
+    else:
+        print(f"Found {len(stale)} stale objects under {prefix} (dry run, pass --delete to remove them)")
+    return stale
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    rewrite_parser = commands.add_parser('rewrite', help="point catalog URLs at the content-hashed objects")
+    rewrite_parser.add_argument('catalogs', nargs='+')
+    sweep_parser = commands.add_parser('sweep', help="remove objects no longer in use")
+    sweep_parser.add_argument('--catalog', action='append', default=[], help="catalog whose links are kept (repeatable)")
+    sweep_parser.add_argument('--prefix', default=STORAGE_PREFIX)
+    sweep_parser.add_argument('--min-age-hours', type=float, default=MIN_AGE_HOURS)
+    sweep_parser.add_argument('--delete', action='store_true', help="delete instead of only listing")
+    args = parser.parse_args()
+
+    if args.command == 'rewrite':
+        url_map = get_upload_manifest().alias_urls()
+        for catalog_file in args.catalogs:
+            rewrite_catalog(catalog_file, url_map)
+        return
+
+    # Only the sweep needs a bucket connection
+    from firebase_bucket import get_bucket
+    bucket = get_bucket()
+    if not bucket:
+        return
+    for path in sweep(bucket, catalog_files=args.catalog, prefix=args.prefix, delete=args.delete,
+                      min_age_hours=args.min_age_hours):
+        print(f"  {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Stream records out of and into large JSON catalog files without holding the
+whole document in memory. Both the bare-array layout
+(series_ready_for_db.json) and the {"series": [...]} wrapper (series.json)
+are supported.
+"""
+import json
+import os
+
+CHUNK_SIZE = 1024 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\r\n'
+
+class _Reader:
+    """Buffered character reader that refills from the file as the parser consumes it"""
+
+    def __init__(self, f):
+        self.f = f
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        if self.eof:
+            return False
+        chunk = self.f.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def skip_whitespace(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.fill():
+                return
+
+    def peek(self):
+        self.skip_whitespace()
+        if self.pos >= len(self.buffer):
+            raise ValueError("Unexpected end of JSON input")
+        return self.buffer[self.pos]
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}, found {self.buffer[self.pos]!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value, reading more input until it parses"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                if not self.fill():
+                    raise
+                continue
+            # A number cut by the end of the buffer decodes short ('0.' of '0.25' as 0,
+            # '1e+' of '1e+5' as 1), so read on while the value ends that close to it
+            if end > len(self.buffer) - 3 and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
+
+def _iter_array(reader):
+    reader.expect('[')
+    if reader.peek() == ']':
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        separator = reader.peek()
+        reader.pos += 1
+        if separator == ']':
+            return
+        if separator != ',':
+            raise ValueError(f"Expected ',' or ']' in array, found {separator!r}")
+
+def iter_json_array(path, key=None):
+    """
+    Yield the records of a top-level JSON array one at a time. For an object
+    wrapper like {"series": [...]}, the array under key is streamed (or the
+    first array value when key is None); other members are skipped.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = _Reader(f)
+        if reader.peek() == '[':
+            yield from _iter_array(reader)
+            return
+
+        reader.expect('{')
+        while reader.peek() != '}':
+            member = reader.value()
+            reader.expect(':')
+            if reader.peek() == '[' and (key is None or member == key):
+                yield from _iter_array(reader)
+                return
+            reader.value()
+            if reader.peek() == ',':
+                reader.pos += 1
+        raise ValueError(f"No array {'under ' + repr(key) if key else ''} found in {path}")
+
+def detect_wrapper_key(path):
+    """Return the wrapper key of {"key": [...]} files, or None for a bare array"""
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = _Reader(f)
+        if reader.peek() == '[':
+            return None
+        reader.expect('{')
+        return reader.value()
+
+class JsonArrayWriter:
+    """
+    Write records to a JSON array one at a time, optionally inside a
+    {wrapper_key: [...]} object. The file is written next to the target and
+    moved into place on a clean close, so readers never see half a catalog.
+    indent=None writes one compact record per line, which is several times
+    faster to encode.
+    """
+
+    def __init__(self, path, wrapper_key=None, indent=2):
+        self.path = path
+        self.wrapper_key = wrapper_key
+        self.indent = indent
+        self.count = 0
+        self._tmp_path = f"{path}.tmp"
+        self._file = open(self._tmp_path, 'w', encoding='utf-8')
+        self._outer_indent = ' ' * (indent or 0)
+        self._item_indent = ' ' * ((indent or 0) * (2 if wrapper_key else 1))
+        if wrapper_key:
+            self._file.write('{\n' + self._outer_indent + json.dumps(wrapper_key) + ': [')
+        else:
+            self._file.write('[')
+
+    def write(self, record):
+        text = json.dumps(record, indent=self.indent)
+        if self.indent is not None:
+            text = text.replace('\n', '\n' + self._item_indent)
+        self._file.write((',\n' if self.count else '\n') + self._item_indent + text)
+        self.count += 1
+
+    def close(self, commit=True):
+        closing = '\n' + (self._outer_indent if self.wrapper_key else '') + ']' if self.count else ']'
+        if self.wrapper_key:
+            closing += '\n}'
+        self._file.write(closing + '\n')
+        self._file.close()
+        if commit:
+            os.replace(self._tmp_path, self.path)
+        else:
+            os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(commit=exc_type is None)
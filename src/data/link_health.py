@@ -0,0 +1,294 @@
+"""
+Check every download link in the catalogs: the episode links (and their
+alternatives and season packs) in series.json and the final_links of the
+movie files. Each link gets a `health` entry with whether it is live, the
+real content length, how long the host took to answer, and whether the
+hand-entered size is right.
+
+Links are probed with HEAD through a pooled client that caps the requests in
+flight per host; hosts that refuse HEAD or leave out the length get a
+one-byte range GET instead. Results are cached in SQLite, so a rerun within
+the TTL only probes new links.
+
+    python src/data/link_health.py [--series FILE] [--movies FILE ...] [--refresh] [--dry-run]
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+import requests
+
+from http_client import PooledHttpClient
+from json_stream import iter_json_array, detect_wrapper_key, JsonArrayWriter
+from series_normalizer import parse_size
+
+SERIES_FILE = "src/data/series.json"
+MOVIE_FILES = [
+    "src/data/movies_with_firebase_urls.json",
+    "src/data/movies_firebase_ready.json",
+    "src/data/movies_ready_for_firebase.json"
+]
+CACHE_FILE = os.path.join('temp_images', 'link_health.sqlite')
+
+# Live links are rechecked after a day, dead ones sooner in case it was a blip
+LIVE_TTL = 24 * 60 * 60
+DEAD_TTL = 6 * 60 * 60
+WORKERS = 32
+# Requests in flight per host; file hosts rate-limit aggressive clients
+PER_HOST = 8
+TIMEOUT = 15
+# Declared sizes are rounded ("1.1GB"), so allow this much difference
+SIZE_TOLERANCE = 0.05
+# Hosts listed in the summary, busiest first
+SUMMARY_HOSTS = 10
+
+PROBE_HEADERS = {'Accept': '*/*', 'Accept-Encoding': 'identity'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS link_health (
+    url TEXT PRIMARY KEY,
+    alive INTEGER NOT NULL,
+    status INTEGER,
+    content_length INTEGER,
+    response_ms INTEGER,
+    reason TEXT,
+    checked_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+RESULT_FIELDS = ('alive', 'status', 'content_length', 'response_ms', 'reason', 'checked_at')
+
+class LinkHealthCache:
+    """Probe results by URL, each valid until its TTL runs out"""
+
+    def __init__(self, cache_file=CACHE_FILE, live_ttl=LIVE_TTL, dead_ttl=DEAD_TTL):
+        self.live_ttl = live_ttl
+        self.dead_ttl = dead_ttl
+        cache_dir = os.path.dirname(cache_file)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(cache_file, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+
+    def get(self, url):
+        """Return the cached result for the URL, or None if there is none or it expired"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT alive, status, content_length, response_ms, reason, checked_at "
+                "FROM link_health WHERE url = ? AND expires_at > ?",
+                (url, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        result = dict(zip(RESULT_FIELDS, row))
+        result['alive'] = bool(result['alive'])
+        return result
+
+    def put(self, url, result):
+        ttl = self.live_ttl if result['alive'] else self.dead_ttl
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO link_health "
+                "(url, alive, status, content_length, response_ms, reason, checked_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, int(result['alive']), result['status'], result['content_length'], result['response_ms'],
+                 result['reason'], result['checked_at'], result['checked_at'] + ttl)
+            )
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+def content_length(response):
+    """Full size of the resource, from Content-Range on 206 answers or Content-Length otherwise"""
+    content_range = response.headers.get('Content-Range', '')
+    if '/' in content_range:
+        total = content_range.rsplit('/', 1)[1].strip()
+        return int(total) if total.isdigit() else None
+    if response.status_code == 206:
+        return None
+    length = response.headers.get('Content-Length', '')
+    return int(length) if length.isdigit() else None
+
+def probe(client, url, timeout=TIMEOUT):
+    """
+    HEAD the URL, falling back to a one-byte range GET when HEAD tells us
+    nothing useful. response_ms is the host's time to answer, without the wait
+    for a free slot on the host.
+    """
+    started = time.monotonic()
+    status = length = reason = None
+    seconds = 0.0
+    if not url.startswith(('http://', 'https://')):
+        # Some legacy records have the size or quality in the link field
+        return {'alive': False, 'status': None, 'content_length': None, 'response_ms': None,
+                'reason': "not a URL", 'checked_at': time.time()}
+    try:
+        response = client.head(url, headers=PROBE_HEADERS, allow_redirects=True, timeout=timeout)
+        status = response.status_code
+        length = content_length(response)
+        seconds = response.elapsed.total_seconds()
+        if status in (403, 405, 501) or (response.ok and length is None):
+            with client.stream(url, headers={**PROBE_HEADERS, 'Range': 'bytes=0-0'},
+                               allow_redirects=True, timeout=timeout) as response:
+                status = response.status_code
+                length = content_length(response)
+                seconds += response.elapsed.total_seconds()
+        if status >= 400:
+            reason = f"HTTP {status}"
+    except requests.RequestException as e:
+        reason = type(e).__name__
+        seconds = seconds or time.monotonic() - started
+    return {
+        'alive': reason is None,
+        'status': status,
+        'content_length': length if reason is None else None,
+        'response_ms': round(seconds * 1000),
+        'reason': reason,
+        'checked_at': time.time()
+    }
+
+def iter_link_entries(record):
+    """Yield (entry, url_key) for every download link of a series or movie record"""
+    for link in record.get('final_links') or []:
+        if isinstance(link, dict) and link.get('url'):
+            yield link, 'url'
+    for season in record.get('seasons') or []:
+        for episode in season.get('episodes') or []:
+            if episode.get('link'):
+                yield episode, 'link'
+            for link in episode.get('links') or []:
+                if link.get('link'):
+                    yield link, 'link'
+        for pack in season.get('packs') or []:
+            if pack.get('link'):
+                yield pack, 'link'
+
+def collect_urls(catalog_files):
+    """Distinct link URLs across the catalogs, in the order they first appear"""
+    urls = {}
+    for catalog_file in catalog_files:
+        for record in iter_json_array(catalog_file):
+            for entry, key in iter_link_entries(record):
+                urls[entry[key]] = None
+    return list(urls)
+
+def check_links(urls, client, cache=None, workers=WORKERS, refresh=False, progress_every=500):
+    """Return {url: result}, probing only the URLs without a fresh cached result"""
+    results = {}
+    pending = []
+    for url in urls:
+        cached = None if (cache is None or refresh) else cache.get(url)
+        if cached is None:
+            pending.append(url)
+        else:
+            results[url] = cached
+    print(f"🔗 {len(urls)} links: {len(results)} cached, {len(pending)} to check")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(probe, client, url): url for url in pending}
+        for done, future in enumerate(as_completed(futures), 1):
+            url = futures[future]
+            result = results[url] = future.result()
+            if cache is not None:
+                cache.put(url, result)
+            if done % progress_every == 0:
+                print(f"Checked {done}/{len(pending)} links")
+    return results
+
+def health_entry(entry, result):
+    """The `health` value stored on a link entry"""
+    health = {
+        'alive': result['alive'],
+        'status': result['status'],
+        'content_length': result['content_length'],
+        'response_ms': result['response_ms'],
+        'checked_at': datetime.fromtimestamp(result['checked_at'], timezone.utc).isoformat(timespec='seconds')
+    }
+    if result['reason']:
+        health['reason'] = result['reason']
+    declared = entry.get('size_bytes') or (parse_size(entry['size']) if isinstance(entry.get('size'), str) else None)
+    if declared and result['content_length']:
+        health['size_matches'] = abs(result['content_length'] - declared) <= declared * SIZE_TOLERANCE
+    return health
+
+def annotate_catalog(catalog_file, results):
+    """Write the probe results into the link entries of a catalog file in place"""
+    with JsonArrayWriter(catalog_file, wrapper_key=detect_wrapper_key(catalog_file)) as writer:
+        for record in iter_json_array(catalog_file):
+            for entry, key in iter_link_entries(record):
+                result = results.get(entry[key])
+                if result is not None:
+                    entry['health'] = health_entry(entry, result)
+            writer.write(record)
+    print(f"✅ Updated link health in {writer.count} records of {catalog_file}")
+
+def summarize(results):
+    """Per-host counts of live and dead links and the mean response time"""
+    hosts = {}
+    for url, result in results.items():
+        host = urlparse(url).netloc or '(not a URL)'
+        stats = hosts.setdefault(host, {'links': 0, 'alive': 0, 'answered': 0, 'total_ms': 0})
+        stats['links'] += 1
+        stats['alive'] += 1 if result['alive'] else 0
+        if result['response_ms'] is not None:
+            stats['answered'] += 1
+            stats['total_ms'] += result['response_ms']
+    return {
+        host: {'links': s['links'], 'alive': s['alive'], 'dead': s['links'] - s['alive'],
+               'mean_ms': round(s['total_ms'] / s['answered']) if s['answered'] else None}
+        for host, s in sorted(hosts.items(), key=lambda item: -item[1]['links'])
+    }
+
+def scan_catalogs(catalog_files, client=None, cache=None, workers=WORKERS, per_host=PER_HOST, refresh=False,
+                  dry_run=False):
+    """Check every link in the catalogs and, unless dry_run, write the results back into them"""
+    catalog_files = [path for path in catalog_files if os.path.exists(path)]
+    if client is None:
+        client = PooledHttpClient(max_per_domain=per_host, pool_size=per_host)
+    cache = cache or LinkHealthCache()
+
+    started = time.monotonic()
+    results = check_links(collect_urls(catalog_files), client, cache, workers=workers, refresh=refresh)
+    elapsed = time.monotonic() - started
+
+    summary = summarize(results)
+    dead = sum(stats['dead'] for stats in summary.values())
+    print(f"🔗 {len(results) - dead} live, {dead} dead links ({elapsed:.1f}s)")
+    for host, stats in list(summary.items())[:SUMMARY_HOSTS]:
+        mean = f", {stats['mean_ms']} ms mean" if stats['mean_ms'] is not None else ""
+        print(f"  {host}: {stats['alive']}/{stats['links']} live{mean}")
+    if len(summary) > SUMMARY_HOSTS:
+        print(f"  ... and {len(summary) - SUMMARY_HOSTS} more hosts")
+
+    if not dry_run:
+        for catalog_file in catalog_files:
+            annotate_catalog(catalog_file, results)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--series', default=SERIES_FILE, help="series catalog (pass '' to skip)")
+    parser.add_argument('--movies', nargs='*', default=MOVIE_FILES, help="movie catalogs")
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    parser.add_argument('--per-host', type=int, default=PER_HOST, help="requests in flight per host")
+    parser.add_argument('--refresh', action='store_true', help="ignore cached results")
+    parser.add_argument('--dry-run', action='store_true', help="only print the summary, leave the catalogs alone")
+    args = parser.parse_args()
+
+    catalog_files = ([args.series] if args.series else []) + list(args.movies)
+    scan_catalogs(catalog_files, workers=args.workers, per_host=args.per_host, refresh=args.refresh,
+                  dry_run=args.dry_run)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import json
+import os
+import threading
+from urllib.parse import urlparse
+
+SCOREBOARD_FILE = os.path.join('temp_images', 'mirror_scoreboard.json')
+
+# Weight of the newest sample in the moving latency average
+LATENCY_ALPHA = 0.3
+# Latency assumed for mirrors we have never tried
+DEFAULT_LATENCY = 2.0
+
+def mirror_name(url):
+    """Return the mirror a candidate URL belongs to (its host, e.g. wsrv.nl or web.archive.org)"""
+    return urlparse(url).netloc.lower()
+
+class MirrorScoreboard:
+    """Per-domain success/latency statistics of every mirror, persisted between runs"""
+
+    def __init__(self, path=SCOREBOARD_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._scores = {}
+        self._dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._scores = json.load(f)
+            except Exception as e:
+                print(f"Ignoring unreadable mirror scoreboard {path}: {str(e)}")
+
+    def record(self, source_domain, candidate_url, ok, latency):
+        """Record the outcome of one attempt at a mirror for images of source_domain"""
+        with self._lock:
+            mirrors = self._scores.setdefault(source_domain, {})
+            stats = mirrors.setdefault(mirror_name(candidate_url), {
+                'attempts': 0, 'successes': 0, 'latency': None
+            })
+            stats['attempts'] += 1
+            if ok:
+                stats['successes'] += 1
+            if stats['latency'] is None:
+                stats['latency'] = latency
+            else:
+                stats['latency'] = (1 - LATENCY_ALPHA) * stats['latency'] + LATENCY_ALPHA * latency
+            self._dirty = True
+
+    def score(self, source_domain, candidate_url):
+        """Expected successes per second of waiting for this mirror"""
+        with self._lock:
+            stats = self._scores.get(source_domain, {}).get(mirror_name(candidate_url))
+        if not stats:
+            return 0.5 / DEFAULT_LATENCY
+        # Laplace smoothing so one lucky attempt doesn't dominate
+        success_rate = (stats['successes'] + 1) / (stats['attempts'] + 2)
+        return success_rate / max(stats['latency'] or DEFAULT_LATENCY, 0.05)
+
+    def rank(self, source_domain, candidates):
+        """Order candidates by score; ties keep the original fallback order"""
+        return sorted(candidates, key=lambda url: -self.score(source_domain, url))
+
+    def save(self):
+        """Write the scoreboard to disk if anything changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = json.dumps(self._scores, indent=2)
+            self._dirty = False
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(snapshot)
+        os.replace(tmp_path, self.path)
+
+_scoreboard = None
+_scoreboard_lock = threading.Lock()
+
+def get_scoreboard():
+    """Return the scoreboard shared by every download in this run"""
+    global _scoreboard
+    with _scoreboard_lock:
+        if _scoreboard is None:
+            _scoreboard = MirrorScoreboard()
+        return _scoreboard
@@ -0,0 +1,89 @@
+import os
+import sqlite3
+import threading
+import time
+
+from image_cache import INDEX_FILE
+
+# First retry after six hours, doubling with every failed recheck up to a month
+BASE_TTL = 6 * 60 * 60
+MAX_TTL = 30 * 24 * 60 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dead_urls (
+    url TEXT PRIMARY KEY,
+    reason TEXT,
+    failures INTEGER NOT NULL,
+    first_failed REAL NOT NULL,
+    last_checked REAL NOT NULL,
+    retry_after REAL NOT NULL
+);
+"""
+
+class NegativeCache:
+    """
+    Image URLs whose every mirror failed, with the reason and when to look
+    again. The TTL doubles each time a recheck fails too, so URLs that stay
+    dead are retried less and less often.
+    """
+
+    def __init__(self, index_file=INDEX_FILE, base_ttl=BASE_TTL, max_ttl=MAX_TTL):
+        self.base_ttl = base_ttl
+        self.max_ttl = max_ttl
+        index_dir = os.path.dirname(index_file)
+        if index_dir:
+            os.makedirs(index_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(index_file, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+
+    def check(self, url):
+        """Return {reason, failures, retry_after} if the URL is known dead and not due for a recheck"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT reason, failures, retry_after FROM dead_urls WHERE url = ? AND retry_after > ?",
+                (url, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('reason', 'failures', 'retry_after'), row))
+
+    def record_failure(self, url, reason):
+        """Mark the URL dead, growing its TTL exponentially with each consecutive failure"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT failures FROM dead_urls WHERE url = ?", (url,)).fetchone()
+            failures = (row[0] if row else 0) + 1
+            ttl = min(self.max_ttl, self.base_ttl * 2 ** (failures - 1))
+            self._db.execute(
+                "INSERT INTO dead_urls (url, reason, failures, first_failed, last_checked, retry_after) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET reason = excluded.reason, failures = excluded.failures, "
+                "last_checked = excluded.last_checked, retry_after = excluded.retry_after",
+                (url, reason, failures, now, now, now + ttl)
+            )
+            self._db.commit()
+        return ttl
+
+    def clear(self, url):
+        """Forget a URL that worked again"""
+        with self._lock:
+            self._db.execute("DELETE FROM dead_urls WHERE url = ?", (url,))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+_negative_cache = None
+_negative_cache_lock = threading.Lock()
+
+def get_negative_cache():
+    """Return the negative cache shared by every download in this run"""
+    global _negative_cache
+    with _negative_cache_lock:
+        if _negative_cache is None:
+            _negative_cache = NegativeCache()
+        return _negative_cache
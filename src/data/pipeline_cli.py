@@ -0,0 +1,90 @@
+"""
+Command line entry point for the image pipeline.
+
+    python src/data/pipeline_cli.py series [--resume] [--incremental] [--skip-verify] ...
+    python src/data/pipeline_cli.py movies [--input FILE] [--output FILE] ...
+    python src/data/pipeline_cli.py verify-bucket [--refresh]
+
+Only the standard library is imported up front. The pipeline (PIL, requests,
+NumPy) and firebase_admin are imported by the subcommands that need them,
+so --help and verify-bucket start instantly.
+"""
+import argparse
+import sys
+
+COMMANDS = ('series', 'movies', 'verify-bucket')
+
+def add_run_arguments(parser, input_file, output_file):
+    parser.add_argument('--input', default=input_file, help=f"catalog to read (default: {input_file})")
+    parser.add_argument('--output', default=output_file, help=f"catalog to write (default: {output_file})")
+    parser.add_argument('--resume', action='store_true', help="skip titles already in the progress journal")
+    parser.add_argument('--incremental', action='store_true', help="only process titles that changed since the last run")
+    parser.add_argument('--recheck-dead', action='store_true', help="retry image URLs that failed on earlier runs")
+    parser.add_argument('--resolution', choices=('sequential', 'race', 'hedge'),
+                        help="how fallback mirrors are tried (default: hedge)")
+    parser.add_argument('--race-width', type=int, default=None, help="mirrors tried at the same time for one image")
+    parser.add_argument('--hedge-delay', type=float, default=None, metavar='SECONDS',
+                        help="wait on a mirror this long before starting the next one")
+    parser.add_argument('--force-upload', action='store_true',
+                        help="upload every image even if the bucket already has the same bytes")
+    parser.add_argument('--no-transcode', action='store_true', help="skip the resized WebP variants")
+    parser.add_argument('--workers', type=int, default=None, help="titles processed at the same time")
+    parser.add_argument('--skip-verify', action='store_true',
+                        help="trust the cached bucket name without checking the bucket first")
+    parser.add_argument('--verbose', action='store_true', help="print per-image progress")
+    parser.add_argument('--prometheus', metavar='FILE', help="also write the run metrics in Prometheus text format")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    add_run_arguments(commands.add_parser('series', help="process series images"),
+                      "src/data/series_ready_for_db.json", "src/data/series.json")
+    add_run_arguments(commands.add_parser('movies', help="process movie images"),
+                      "src/data/movies_ready_for_firebase.json", "src/data/movies_with_firebase_urls.json")
+    verify_parser = commands.add_parser('verify-bucket', help="check the credentials and bucket with one metadata read")
+    verify_parser.add_argument('--refresh', action='store_true', help="ignore the cached bucket name")
+    return parser
+
+def run_pipeline(args):
+    import pipeline_metrics
+    import randomabc
+    from firebase_bucket import get_bucket
+
+    randomabc.FORCE_RECHECK = args.recheck_dead
+    randomabc.TRANSCODE_VARIANTS = not args.no_transcode
+    randomabc.INCREMENTAL_UPLOADS = not args.force_upload
+    if args.resolution:
+        randomabc.RESOLUTION_MODE = args.resolution
+    if args.race_width:
+        randomabc.RACE_WIDTH = args.race_width
+    if args.hedge_delay is not None:
+        randomabc.HEDGE_DELAY = args.hedge_delay
+    randomabc.PROMETHEUS_FILE = args.prometheus
+    pipeline_metrics.VERBOSE = args.verbose
+
+    bucket = get_bucket(verify=not args.skip_verify)
+    if not bucket:
+        print("❌ ERROR: Failed to connect to Firebase Storage")
+        return 1
+
+    process = randomabc.process_series_json if args.command == 'series' else randomabc.process_movies_json
+    process(max_workers=args.workers or randomabc.MAX_WORKERS, resume=args.resume, incremental=args.incremental,
+            input_file=args.input, output_file=args.output, bucket=bucket)
+    return 0
+
+def verify_bucket(args):
+    from firebase_bucket import get_bucket
+    return 0 if get_bucket(verify=True, refresh=args.refresh) else 1
+
+def main(argv=None, default_command=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if default_command and not (argv and argv[0] in COMMANDS) and not {'-h', '--help'} & set(argv):
+        # Plain `python randomabc.py --resume` still means the series run
+        argv.insert(0, default_command)
+    args = build_parser().parse_args(argv)
+    if args.command == 'verify-bucket':
+        return verify_bucket(args)
+    return run_pipeline(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
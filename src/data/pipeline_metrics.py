@@ -0,0 +1,202 @@
+"""
+Structured timing and throughput numbers for the image pipeline: per-stage
+latency histograms, byte counters, per-domain success rates and items per
+second. A run ends by writing them as a JSON report and, optionally, as a
+Prometheus text file (for node_exporter's textfile collector).
+
+Per-item progress lines go through log(), which only prints with VERBOSE.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Print per-item progress lines (set by --verbose)
+VERBOSE = False
+
+REPORT_FILE = os.path.join('temp_images', 'run_metrics.json')
+# Upper bounds in seconds, like a Prometheus histogram
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+def log(message):
+    """Progress output that is silent unless VERBOSE is set"""
+    if VERBOSE:
+        print(message)
+
+class Histogram:
+    """Bucketed latency histogram; percentiles are estimated from the bucket bounds"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        for n, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[n] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, q):
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for n, bound in enumerate(self.buckets):
+            seen += self.counts[n]
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'buckets': {str(bound): count for bound, count in zip(self.buckets + ('+Inf',), self.counts)}
+        }
+
+class PipelineMetrics:
+    """Thread-safe collector shared by every worker in a run"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.stages = {}
+        self.stage_errors = {}
+        self.counters = {}
+        self.bytes = {}
+        self.domains = {}
+        self.items = {}
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block into the named stage histogram"""
+        started = time.monotonic()
+        try:
+            yield
+        except BaseException:
+            self.count(f"{name}_errors", target=self.stage_errors)
+            raise
+        finally:
+            self.observe(name, time.monotonic() - started)
+
+    def count(self, name, n=1, target=None):
+        target = self.counters if target is None else target
+        with self._lock:
+            target[name] = target.get(name, 0) + n
+
+    def add_bytes(self, name, n):
+        self.count(name, n, target=self.bytes)
+
+    def record_domain(self, domain, ok, seconds):
+        with self._lock:
+            stats = self.domains.setdefault(domain, {'attempts': 0, 'successes': 0, 'seconds': 0.0})
+            stats['attempts'] += 1
+            stats['successes'] += 1 if ok else 0
+            stats['seconds'] += seconds
+
+    def item_done(self, kind):
+        self.count(kind, target=self.items)
+
+    def report(self):
+        with self._lock:
+            elapsed = time.monotonic() - self.started
+            return {
+                'elapsed_seconds': round(elapsed, 3),
+                'stages': {name: histogram.snapshot() for name, histogram in sorted(self.stages.items())},
+                'stage_errors': dict(self.stage_errors),
+                'counters': dict(self.counters),
+                'bytes': dict(self.bytes),
+                'domains': {
+                    domain: {
+                        'attempts': stats['attempts'],
+                        'successes': stats['successes'],
+                        'success_rate': round(stats['successes'] / stats['attempts'], 4),
+                        'mean_seconds': round(stats['seconds'] / stats['attempts'], 4)
+                    }
+                    for domain, stats in sorted(self.domains.items())
+                },
+                'items': {
+                    kind: {'count': count, 'per_second': round(count / elapsed, 3) if elapsed else None}
+                    for kind, count in self.items.items()
+                }
+            }
+
+    def write_json(self, path=REPORT_FILE):
+        report = self.report()
+        _write_text(path, json.dumps(report, indent=2))
+        return report
+
+    def write_prometheus(self, path, prefix='catalog_pipeline'):
+        """Write the metrics in the Prometheus text exposition format"""
+        with self._lock:
+            lines = [f"# TYPE {prefix}_stage_seconds histogram"]
+            for name, histogram in sorted(self.stages.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {histogram.sum}')
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {histogram.count}')
+            lines.append(f"# TYPE {prefix}_bytes_total counter")
+            lines.extend(f'{prefix}_bytes_total{{kind="{name}"}} {n}' for name, n in sorted(self.bytes.items()))
+            lines.append(f"# TYPE {prefix}_events_total counter")
+            lines.extend(f'{prefix}_events_total{{event="{name}"}} {n}'
+                         for name, n in sorted({**self.counters, **self.stage_errors}.items()))
+            lines.append(f"# TYPE {prefix}_items_total counter")
+            lines.extend(f'{prefix}_items_total{{kind="{kind}"}} {n}' for kind, n in sorted(self.items.items()))
+            lines.append(f"# TYPE {prefix}_domain_attempts_total counter")
+            for domain, stats in sorted(self.domains.items()):
+                lines.append(f'{prefix}_domain_attempts_total{{domain="{domain}",result="success"}} {stats["successes"]}')
+                lines.append(f'{prefix}_domain_attempts_total{{domain="{domain}",result="failure"}} '
+                             f'{stats["attempts"] - stats["successes"]}')
+        _write_text(path, '\n'.join(lines) + '\n')
+
+def _write_text(path, text):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+def get_metrics():
+    """Return the metrics collector shared by every worker in this run"""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = PipelineMetrics()
+        return _metrics
+
+def reset_metrics():
+    """Start a fresh collector, e.g. between benchmark runs in one process"""
+    global _metrics
+    with _metrics_lock:
+        _metrics = PipelineMetrics()
+        return _metrics
@@ -0,0 +1,90 @@
+import json
+import os
+import threading
+
+class ProgressJournal:
+    """
+    Append-only JSONL log of finished records, one {"key", "record"} object per
+    line. A run appends each record as soon as it is done, so a crash loses at
+    most the line being written and --resume can pick up where it stopped.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a' if resume else 'w', encoding='utf-8')
+        if resume and self._file.tell() > 0:
+            # Start on a fresh line if the previous run died mid-write
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    self._file.write('\n')
+
+    def append(self, key, record):
+        """Write one finished record and flush it to disk"""
+        line = json.dumps({'key': key, 'record': record}, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class JournalIndex:
+    """
+    Keys of the records already in a journal, with their byte offsets. Records
+    are read back from disk on demand, so resuming a large run doesn't hold
+    every finished record in memory.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._offsets = {}
+        self._lock = threading.Lock()
+        self._file = None
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb') as f:
+            offset = 0
+            for line_number, line in enumerate(f, 1):
+                try:
+                    entry = json.loads(line)
+                    self._offsets[entry['key']] = offset
+                except ValueError:
+                    # The last line can be cut short by a crash
+                    print(f"Ignoring incomplete journal line {line_number} in {path}")
+                offset += len(line)
+        self._file = open(path, 'rb')
+
+    def __contains__(self, key):
+        return key in self._offsets
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def get(self, key, default=None):
+        offset = self._offsets.get(key)
+        if offset is None:
+            return default
+        with self._lock:
+            self._file.seek(offset)
+            line = self._file.readline()
+        return json.loads(line)['record']
+
+    def close(self):
+        if self._file:
+            self._file.close()
+
+def load_journal(path):
+    """Return an index of everything already in the journal"""
+    return JournalIndex(path)
@@ -1,114 +1,145 @@
-import json
-import firebase_admin
-from firebase_admin import credentials, storage
 import os
-from datetime import datetime
-import requests
+import socket
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from collections import deque
 from urllib.parse import urlparse
 import hashlib
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
-import random
+from PIL import Image, ImageDraw, ImageFont
+import re
+from functools import lru_cache
 
-def refresh_firebase_credentials():
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from http_client import get_http_client, print_connection_stats
+from firebase_bucket import get_bucket
+from mirror_scoreboard import get_scoreboard
+from image_cache import get_image_cache
+from negative_cache import get_negative_cache
+from upload_manifest import get_upload_manifest, file_md5_base64
+from progress_journal import ProgressJournal, load_journal
+from json_stream import iter_json_array, JsonArrayWriter
+from change_detection import iter_with_ids, record_id, record_fingerprint, load_manifest, save_manifest
+from image_validation import StreamingImageValidator, InvalidImage
+from image_variants import transcode_variants, get_transcode_pool, shutdown_transcode_pool
+from catalog_export import export_catalog
+from immutable_storage import IMMUTABLE_CACHE_CONTROL, immutable_path, content_type_for, rewrite_urls
+import pipeline_metrics
+from pipeline_metrics import get_metrics, reset_metrics, log
+
+# Number of titles processed at the same time
+MAX_WORKERS = 4
+# Number of image downloads/uploads in flight across all titles
+IMAGE_WORKERS = 8
+# How fallback URLs are resolved: 'sequential', 'race' (start RACE_WIDTH at once)
+# or 'hedge' (start the next mirror when the current one is slower than HEDGE_DELAY)
+RESOLUTION_MODE = 'hedge'
+# Maximum number of mirrors tried at the same time for one image
+RACE_WIDTH = 2
+# Seconds to wait on a mirror before hedging with the next one
+HEDGE_DELAY = 1.5
+# Seconds to wait for a mirror to accept the connection, and between bytes once connected
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+# Compare local hashes with the manifest/bucket and skip uploads of unchanged images
+INCREMENTAL_UPLOADS = True
+# Produce resized WebP variants (see image_variants.VARIANT_WIDTHS) next to each original
+TRANSCODE_VARIANTS = True
+# Retry URLs the negative cache knows to be dead instead of using their placeholder
+FORCE_RECHECK = False
+# Upload to content-hashed paths served with a year-long immutable Cache-Control
+IMMUTABLE_UPLOADS = True
+# Also write the run metrics in Prometheus text format to this file (None to skip)
+PROMETHEUS_FILE = None
+# Where paged, precompressed copies of each finished catalog are written (None to skip)
+CATALOG_EXPORT_DIR = os.path.join('public', 'catalog')
+
+# Fallback attempts run here so image workers can wait on several mirrors at once
+_race_pool = None
+_race_pool_lock = threading.Lock()
+
+def start_race_pool(image_workers=None, race_width=None):
     """
-    Refresh Firebase credentials and test with a simple upload
+    Size the race pool for this run. Cancelled attempts can linger until their
+    read timeout, so there is room for a second round of them.
     """
-    print("Attempting to refresh Firebase credentials...")
-    
+    global _race_pool
+    image_workers = image_workers or IMAGE_WORKERS
+    race_width = race_width or RACE_WIDTH
+    with _race_pool_lock:
+        if _race_pool is not None:
+            _race_pool.shutdown(wait=False, cancel_futures=True)
+        _race_pool = ThreadPoolExecutor(max_workers=image_workers * race_width * 2)
+        return _race_pool
+
+def get_race_pool():
+    with _race_pool_lock:
+        pool = _race_pool
+    return pool or start_race_pool()
+
+def shutdown_race_pool():
+    global _race_pool
+    with _race_pool_lock:
+        if _race_pool is not None:
+            # Cancelled attempts end on their own; the run doesn't wait for them
+            _race_pool.shutdown(wait=False, cancel_futures=True)
+            _race_pool = None
+
+class RaceCancel:
+    """
+    Cancellation flag shared by the attempts of one race. Setting it also
+    shuts down the sockets of their open responses, so a loser stuck reading
+    a slow body gives its thread and domain slot back right away.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._responses = set()
+
+    def is_set(self):
+        return self._event.is_set()
+
+    def set(self):
+        with self._lock:
+            self._event.set()
+            responses = list(self._responses)
+        for response in responses:
+            _abort_response(response)
+
+    def track(self, response):
+        with self._lock:
+            if not self._event.is_set():
+                self._responses.add(response)
+                return
+        _abort_response(response)
+
+    def untrack(self, response):
+        with self._lock:
+            self._responses.discard(response)
+
+def _abort_response(response):
+    """Shut the connection down under a response another thread may be reading"""
+    sock = getattr(getattr(response.raw, 'connection', None), 'sock', None)
+    if sock is None:
+        return
     try:
-        # Initialize Firebase with your service account key
-        cred_path = "src/data/goforcab-941-2bbc38a80938.json"
-        
-        # Check if credentials file exists
-        if not os.path.exists(cred_path):
-            print(f"❌ ERROR: Credentials file not found at {cred_path}")
-            return False
-            
-        # Try to initialize Firebase Admin SDK
-        if firebase_admin._apps:
-            # If already initialized, delete the app
-            for app in firebase_admin._apps.copy():
-                firebase_admin.delete_app(firebase_admin.get_app(app))
-        
-        # Load credentials to get project ID
-        with open(cred_path, 'r') as file:
-            cred_data = json.load(file)
-            
-        project_id = cred_data.get('project_id', 'goforcab-941')
-        print(f"Using project ID: {project_id}")
-        
-        # Use the correct bucket name
-        bucket_name = f"{project_id}.appspot.com"  # Standard format
-        
-        # Initialize Firebase with the correct bucket
-        cred = credentials.Certificate(cred_path)
-        firebase_admin.initialize_app(cred, {
-            'storageBucket': bucket_name
-        })
-        
-        # Get a reference to storage
-        bucket = storage.bucket()
-        
-        # Create a test file
-        test_file_path = "temp_test_file.txt"
-        with open(test_file_path, "w") as f:
-            f.write(f"Test file created at {datetime.now().isoformat()}")
-        
-        # Upload the test file to Firebase Storage
-        blob = bucket.blob(f"test/firebase_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
-        blob.upload_from_filename(test_file_path)
-        
-        # Make the test file public
-        blob.make_public()
-        
-        # Delete the local test file
-        os.remove(test_file_path)
-        
-        print(f"✅ SUCCESS: Firebase connection working! Test file uploaded to {blob.public_url}")
-        print(f"✅ Connected to bucket: {bucket_name}")
-        return bucket
-        
-    except Exception as e:
-        print(f"❌ ERROR: Failed to refresh Firebase credentials: {str(e)}")
-        
-        if "The specified bucket does not exist" in str(e):
-            print("\n❌ ERROR: Bucket does not exist. Trying alternative bucket name...")
-            
-            # Try with firebasestorage.app domain
-            try:
-                if firebase_admin._apps:
-                    for app in firebase_admin._apps.copy():
-                        firebase_admin.delete_app(firebase_admin.get_app(app))
-                
-                alt_bucket_name = f"{project_id}.firebasestorage.app"
-                firebase_admin.initialize_app(cred, {
-                    'storageBucket': alt_bucket_name
-                })
-                
-                bucket = storage.bucket()
-                blob = bucket.blob(f"test/firebase_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
-                blob.upload_from_filename(test_file_path)
-                blob.make_public()
-                os.remove(test_file_path)
-                
-                print(f"✅ SUCCESS: Firebase connection working with alternative bucket!")
-                print(f"✅ Connected to bucket: {alt_bucket_name}")
-                return bucket
-                
-            except Exception as alt_error:
-                print(f"❌ ERROR with alternative bucket: {str(alt_error)}")
-        
-        if "invalid_grant" in str(e):
-            print("\n🔑 SOLUTION: Your service account key has expired. Follow these steps:")
-            print("1. Go to the Firebase Console (https://console.firebase.google.com/)")
-            print("2. Select your project")
-            print("3. Go to Project Settings > Service accounts")
-            print("4. Click 'Generate new private key'")
-            print("5. Download the new key and replace the existing one at:", cred_path)
-        
-        return None
+        # The plain socket call, so an SSL socket's state isn't torn down under the reader
+        socket.socket.shutdown(sock, socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+def refresh_firebase_credentials(verify=True):
+    """
+    Connect to the Firebase Storage bucket. The app is initialized once and
+    the working bucket name is cached; verify does a metadata read, not an upload.
+    """
+    return get_bucket(verify=verify)
 
 def is_valid_image_url(url):
     """Check if URL is a valid image URL"""
@@ -120,191 +151,336 @@ def is_valid_image_url(url):
     
     return url.startswith('http') and any(ext in url.lower() for ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp'])
 
-def download_image(url, movie_title, image_type, index=0):
-    """Download image from URL with multiple fallback options"""
-    try:
-        if not is_valid_image_url(url):
-            return None
-        
-        # Create a filename based on movie title and image type
-        title_slug = ''.join(c for c in movie_title if c.isalnum() or c.isspace()).strip().replace(' ', '_').lower()[:50]
-        url_hash = hashlib.md5(url.encode()).hexdigest()[:10]
-        extension = os.path.splitext(urlparse(url).path)[1].lower() or '.jpg'
-        if not extension.startswith('.'):
-            extension = '.jpg'
-        
-        filename = f"{title_slug}_{image_type}_{index}_{url_hash}{extension}"
-        filepath = os.path.join('temp_images', filename)
-        
-        # Create temp directory if it doesn't exist
-        if not os.path.exists('temp_images'):
-            os.makedirs('temp_images')
-        
-        # Check if file already exists and is valid
-        if os.path.exists(filepath) and os.path.getsize(filepath) > 1000:
-            try:
-                with Image.open(filepath) as img:
-                    # Just verify the image
-                    img.verify()
-                print(f"Using cached image for {movie_title} ({image_type})")
-                return filepath
-            except Exception:
-                # If verification fails, remove the file and try again
-                os.remove(filepath)
-        
-        # Setup session with headers
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
-            'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Referer': 'https://www.google.com/'
-        })
-        
-        # Prepare list of URLs to try
-        urls_to_try = [url]
-        
-        # Original domain/path info
-        parsed_url = urlparse(url)
-        domain = parsed_url.netloc
-        path = parsed_url.path
-        filename_only = os.path.basename(path)
-        
-        # Add alternative URLs based on common patterns
-        if domain == 'vegamovies.st' or domain == 'vegamovies.ps':
-            # Try different domain variations
-            if domain == 'vegamovies.st':
-                urls_to_try.append(f"https://vegamovies.ps{path}")
-            else:
-                urls_to_try.append(f"https://images.weserv.nl/?url=https://{domain}{path}")
-                
-                urls_to_try.append(f"https://vegamovies.st{path}")
-
-            urls_to_try.append(f"https://images.weserv.nl/?url=https://{domain}{path}")
+def build_candidate_urls(url, movie_title, image_type):
+    """Build the list of fallback URLs to try for an image, original URL first"""
+    urls_to_try = [url]
+    
+    # Original domain/path info
+    parsed_url = urlparse(url)
+    domain = parsed_url.netloc
+    path = parsed_url.path
+    filename_only = os.path.basename(path)
     
+    # Add alternative URLs based on common patterns
+    if domain == 'vegamovies.st' or domain == 'vegamovies.ps':
+        # Try different domain variations
+        if domain == 'vegamovies.st':
+            urls_to_try.append(f"https://vegamovies.ps{path}")
+        else:
+            urls_to_try.append(f"https://images.weserv.nl/?url=https://{domain}{path}")
             
-            # Try with web.archive.org
-            urls_to_try.append(f"https://web.archive.org/web/0/https://{domain}{path}")
+            urls_to_try.append(f"https://vegamovies.st{path}")
+
+        urls_to_try.append(f"https://images.weserv.nl/?url=https://{domain}{path}")
+
+        
+        # Try with web.archive.org
+        urls_to_try.append(f"https://web.archive.org/web/0/https://{domain}{path}")
+        
+        # Try image proxy services
+        urls_to_try.append(f"https://wsrv.nl/?url=https://{domain}{path}")
+        
+        # Try Google's cache (doesn't always work but worth trying)
+        urls_to_try.append(f"https://webcache.googleusercontent.com/search?q=cache:https://{domain}{path}")
+        
+        # Search for filename in alternative domains
+        title_keywords = movie_title.split()
+        if title_keywords:
+            main_keyword = title_keywords[0].lower()
+            year = ""
+            # Extract year if present
+            for word in title_keywords:
+                if word.startswith("(") and word.endswith(")") and len(word) == 6:
+                    year = word[1:5]  # Extract year from (YYYY)
             
-            # Try image proxy services
-            urls_to_try.append(f"https://wsrv.nl/?url=https://{domain}{path}")
+            # If we have a keyword and year, try Google Images Search via proxies
+            if main_keyword and year:
+                search_query = f"{main_keyword} {year} movie poster"
+                urls_to_try.append(f"https://www.google.com/search?q={search_query}&tbm=isch")
             
-            # Try Google's cache (doesn't always work but worth trying)
-            urls_to_try.append(f"https://webcache.googleusercontent.com/search?q=cache:https://{domain}{path}")
+    elif domain == 'imgbb.top':
+        # Try image proxy services for imgbb
+        urls_to_try.append(f"https://img.freepik.com/free-photo/{filename_only}")
+        urls_to_try.append(f"https://images.weserv.nl/?url=https://{domain}{path}")
+        urls_to_try.append(f"https://wsrv.nl/?url=https://{domain}{path}")
+        
+    elif domain == 'i.imgur.com':
+        # Try alternative imgur domains
+        img_id = filename_only.split('.')[0]
+        urls_to_try.append(f"https://imgur.com/{img_id}.jpg")
+        urls_to_try.append(f"https://imgur.com/{img_id}.png")
+        
+    # For image type 'featured', also try searching for movie posters
+    if image_type == 'featured':
+        # Clean movie title and search for poster
+        clean_title = movie_title.replace('(', '').replace(')', '').strip()
+        urls_to_try.append(f"https://www.themoviedb.org/search?query={clean_title}")
+    
+    # The weserv entry can be listed twice for vegamovies.ps
+    return list(dict.fromkeys(urls_to_try))
+
+def fetch_candidate(attempt_url, filepath, cancel_event=None):
+    """
+    Download one candidate URL to filepath, validating it while it streams in.
+    Returns its format, size, dimensions and sha256 on success.
+    """
+    client = get_http_client()
+    metrics = get_metrics()
+    log(f"Trying URL: {attempt_url}")
+    
+    try:
+        started = time.monotonic()
+        with client.stream(attempt_url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)) as response:
+            # Time to response headers: DNS, connect/TLS and server think time
+            metrics.observe('connect', time.monotonic() - started)
+            if cancel_event is not None:
+                cancel_event.track(response)
+            response.raise_for_status()
             
-            # Search for filename in alternative domains
-            title_keywords = movie_title.split()
-            if title_keywords:
-                main_keyword = title_keywords[0].lower()
-                year = ""
-                # Extract year if present
-                for word in title_keywords:
-                    if word.startswith("(") and word.endswith(")") and len(word) == 6:
-                        year = word[1:5]  # Extract year from (YYYY)
-                
-                # If we have a keyword and year, try Google Images Search via proxies
-                if main_keyword and year:
-                    search_query = f"{main_keyword} {year} movie poster"
-                    urls_to_try.append(f"https://www.google.com/search?q={search_query}&tbm=isch")
-                
-        elif domain == 'imgbb.top':
-            # Try image proxy services for imgbb
-            urls_to_try.append(f"https://img.freepik.com/free-photo/{filename_only}")
-            urls_to_try.append(f"https://images.weserv.nl/?url=https://{domain}{path}")
-            urls_to_try.append(f"https://wsrv.nl/?url=https://{domain}{path}")
+            # Check if we got an actual image
+            content_type = response.headers.get('Content-Type', '')
+            if 'image/' not in content_type and 'text/html' in content_type:
+                # If it's an HTML page, this might be a search result
+                # We would need to parse HTML to extract image URLs, which is complex
+                # For now, skip this URL
+                raise InvalidImage("HTML page instead of an image")
             
-        elif domain == 'i.imgur.com':
-            # Try alternative imgur domains
-            img_id = filename_only.split('.')[0]
-            urls_to_try.append(f"https://imgur.com/{img_id}.jpg")
-            urls_to_try.append(f"https://imgur.com/{img_id}.png")
+            # Chunked responses have no length, they are checked as they stream
+            content_length = response.headers.get('Content-Length')
+            if content_length is not None and 'Content-Encoding' not in response.headers:
+                content_length = int(content_length)
+            else:
+                content_length = None
+            validator = StreamingImageValidator(content_length)
             
-        # For image type 'featured', also try searching for movie posters
-        if image_type == 'featured':
-            # Clean movie title and search for poster
-            clean_title = movie_title.replace('(', '').replace(')', '').strip()
-            urls_to_try.append(f"https://www.themoviedb.org/search?query={clean_title}")
-        
-        # Try each URL until one works
-        for attempt_url in urls_to_try:
-            try:
-                print(f"Trying URL: {attempt_url}")
-                
-                response = session.get(attempt_url, timeout=10, stream=True)
-                response.raise_for_status()
-                
-                # Check if we got an actual image
-                content_type = response.headers.get('Content-Type', '')
-                content_length = int(response.headers.get('Content-Length', 0))
-                
-                if 'image/' not in content_type and 'text/html' in content_type:
-                    # If it's an HTML page, this might be a search result
-                    # We would need to parse HTML to extract image URLs, which is complex
-                    # For now, skip this URL
-                    print(f"Skipping HTML content from {attempt_url}")
-                    continue
-                
-                if content_length < 1000:
-                    print(f"Skipping small file ({content_length} bytes) from {attempt_url}")
-                    continue
-                
-                # Save the image
-                with open(filepath, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                
-                # Verify it's a valid image
-                try:
-                    with Image.open(filepath) as img:
-                        img.verify()
-                    print(f"✅ Successfully downloaded image from {attempt_url}")
-                    return filepath
-                except Exception as img_error:
-                    print(f"Downloaded file is not a valid image: {img_error}")
-                    os.remove(filepath)
-                    continue
+            # Save the image, aborting as soon as it can't be a usable image
+            received = 0
+            transfer_started = time.monotonic()
+            with open(filepath, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=8192):
+                    if cancel_event is not None and cancel_event.is_set():
+                        break
+                    received += len(chunk)
+                    validator.feed(chunk)
+                    f.write(chunk)
+            metrics.observe('transfer', time.monotonic() - transfer_started)
+            metrics.add_bytes('downloaded', received)
+            if cancel_event is not None:
+                cancel_event.untrack(response)
+        
+        if cancel_event is not None and cancel_event.is_set():
+            # Another mirror already won the race
+            os.remove(filepath)
+            return None
+        
+        with metrics.stage('validate'):
+            return validator.finish()
+    
+    except InvalidImage:
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        raise
+
+def timed_fetch(attempt_url, filepath, source_domain, cancel_event=None, errors=None):
+    """Run fetch_candidate and record the outcome on the mirror scoreboard (and in errors)"""
+    started = time.monotonic()
+    try:
+        info = fetch_candidate(attempt_url, filepath, cancel_event)
+    except Exception as e:
+        log(f"Error with URL {attempt_url}: {str(e)}")
+        if errors is not None:
+            errors.append(f"{urlparse(attempt_url).netloc}: {str(e)}")
+        info = None
+    # Attempts cut short by the winner say nothing about the mirror
+    if cancel_event is None or not cancel_event.is_set():
+        elapsed = time.monotonic() - started
+        get_scoreboard().record(source_domain, attempt_url, info is not None, elapsed)
+        get_metrics().record_domain(urlparse(attempt_url).netloc, info is not None, elapsed)
+    return info
+
+def resolve_sequential(candidates, filepath, source_domain, errors=None):
+    """Try each candidate in turn until one works, returning the image info"""
+    for attempt_url in candidates:
+        info = timed_fetch(attempt_url, filepath, source_domain, errors=errors)
+        if info:
+            log(f"✅ Successfully downloaded image from {attempt_url}")
+            return info
+        time.sleep(0.5)  # Be nice to servers
+    return None
+
+def _discard_part(part_path):
+    if os.path.exists(part_path):
+        os.remove(part_path)
+
+def resolve_hedged(candidates, filepath, source_domain, race_width=None, hedge_delay=None, errors=None):
+    """
+    Race up to race_width candidates at a time, starting the next one whenever the
+    running ones fail or take longer than hedge_delay. The first valid image wins
+    and the remaining attempts are cancelled. Returns the winner's image info.
+    """
+    if race_width is None:
+        race_width = RACE_WIDTH
+    if hedge_delay is None:
+        hedge_delay = HEDGE_DELAY
+    cancel_event = RaceCancel()
+    race_pool = get_race_pool()
+    remaining = deque(enumerate(candidates))
+    running = {}
+    
+    def launch():
+        n, attempt_url = remaining.popleft()
+        part_path = f"{filepath}.part{n}"
+        future = race_pool.submit(timed_fetch, attempt_url, part_path, source_domain, cancel_event, errors)
+        running[future] = (attempt_url, part_path)
+    
+    launch()
+    try:
+        while running:
+            can_hedge = remaining and len(running) < race_width
+            done, _ = wait(list(running), timeout=hedge_delay if can_hedge else None, return_when=FIRST_COMPLETED)
             
-            except Exception as e:
-                print(f"Error with URL {attempt_url}: {str(e)}")
+            if not done:
+                # Nobody answered in time, start the next mirror alongside
+                launch()
                 continue
             
-            time.sleep(0.5)  # Be nice to servers
+            for future in done:
+                attempt_url, part_path = running.pop(future)
+                info = future.result()
+                if info:
+                    cancel_event.set()
+                    os.replace(part_path, filepath)
+                    log(f"✅ Successfully downloaded image from {attempt_url}")
+                    return info
+                _discard_part(part_path)
+            
+            # Refill the slots of the failed attempts right away
+            while remaining and len(running) < race_width:
+                launch()
+        return None
+    finally:
+        cancel_event.set()
+        for future, (attempt_url, part_path) in running.items():
+            future.add_done_callback(lambda _, part_path=part_path: _discard_part(part_path))
+
+def download_image(url, movie_title, image_type, index=0, resolution=None, force_recheck=None):
+    """
+    Download image from URL with multiple fallback options. Returns (path,
+    placeholder): placeholder is True when no mirror worked and path is a
+    generated stand-in, and path is None when nothing could be produced.
+    """
+    try:
+        if not is_valid_image_url(url):
+            return None, False
+        
+        # Images already fetched from this URL (by any title or pipeline) come from the cache
+        metrics = get_metrics()
+        cache = get_image_cache()
+        cached = cache.lookup(url)
+        if cached:
+            metrics.count('image_cache_hits')
+            log(f"Using cached image for {movie_title} ({image_type})")
+            return cached['path'], False
         
-        print(f"⚠️ All download attempts failed for {movie_title} ({image_type})")
-        return generate_placeholder_image(movie_title, image_type, filepath)
+        url_hash = hashlib.md5(url.encode()).hexdigest()[:10]
+        extension = os.path.splitext(urlparse(url).path)[1].lower() or '.jpg'
+        if not extension.startswith('.'):
+            extension = '.jpg'
+        title_slug = ''.join(c for c in movie_title if c.isalnum() or c.isspace()).strip().replace(' ', '_').lower()[:50]
+        placeholder_path = os.path.join('temp_images', f"{title_slug}_{image_type}_{index}_{url_hash}{extension}")
+        
+        # URLs that failed every mirror recently go straight to the placeholder
+        negative_cache = get_negative_cache()
+        if force_recheck is None:
+            force_recheck = FORCE_RECHECK
+        dead = None if force_recheck else negative_cache.check(url)
+        if dead:
+            metrics.count('dead_url_skips')
+            log(f"Skipping known dead image for {movie_title} ({image_type}): {dead['reason']}")
+            if os.path.exists(placeholder_path):
+                return placeholder_path, True
+            return generate_placeholder_image(movie_title, image_type, placeholder_path), True
+        
+        # Downloads land in a private file and are moved into the cache once verified
+        download_dir = os.path.join('temp_images', 'incoming')
+        os.makedirs(download_dir, exist_ok=True)
+        download_path = os.path.join(download_dir, f"{url_hash}_{uuid.uuid4().hex[:8]}{extension}")
+        
+        # Mirrors that usually work for this domain go first
+        source_domain = urlparse(url).netloc
+        candidates = get_scoreboard().rank(source_domain, build_candidate_urls(url, movie_title, image_type))
+        
+        errors = []
+        resolution = resolution or RESOLUTION_MODE
+        with metrics.stage('resolve'):
+            if resolution == 'sequential':
+                info = resolve_sequential(candidates, download_path, source_domain, errors=errors)
+            elif resolution == 'race':
+                info = resolve_hedged(candidates, download_path, source_domain, hedge_delay=0, errors=errors)
+            else:
+                info = resolve_hedged(candidates, download_path, source_domain, errors=errors)
+        metrics.count('mirror_attempts', len(errors) + (1 if info else 0))
+        
+        if info:
+            with metrics.stage('cache_store'):
+                cached = cache.store(url, download_path, info, sha256=info['sha256'])
+            if cached:
+                metrics.count('downloads')
+                negative_cache.clear(url)
+                return cached['path'], False
+        
+        metrics.count('download_failures')
+        log(f"⚠️ All download attempts failed for {movie_title} ({image_type})")
+        ttl = negative_cache.record_failure(url, '; '.join(errors[-3:]) or "no usable mirror")
+        log(f"Not retrying {url} for {ttl / 3600:.0f}h")
+        return generate_placeholder_image(movie_title, image_type, placeholder_path), True
     
     except Exception as e:
         print(f"Error in download process: {str(e)}")
-        return None
+        return None, False
+
+@lru_cache(maxsize=4)
+def placeholder_background(width, height):
+    """Build the noisy gradient background once; callers draw on a copy"""
+    if np is None:
+        # Without NumPy fall back to one line per row (no noise)
+        image = Image.new('RGB', (width, height), color=(16, 16, 24))
+        draw = ImageDraw.Draw(image)
+        for y in range(height):
+            gradient = int(y / height * 40)
+            draw.line([(0, y), (width - 1, y)], fill=(16 + gradient, 16 + gradient, 24 + int(gradient * 1.5)))
+        return image
+    
+    # Same gradient and noise as the old per-pixel loop, as whole-array operations
+    gradient = (np.arange(height) * 40 // height)[:, None]
+    # Fixed seed, so every process draws the same placeholder bytes (and uploads dedupe)
+    noise = np.random.default_rng(0).integers(-10, 11, size=(height, width))
+    red_green = np.minimum(255, 16 + gradient + noise)
+    blue = np.minimum(255, 24 + (gradient * 3) // 2 + noise)
+    pixels = np.stack([red_green, red_green, blue], axis=-1).astype(np.uint8)
+    return Image.fromarray(pixels, 'RGB')
+
+@lru_cache(maxsize=1)
+def placeholder_font(font_size=40):
+    try:
+        return ImageFont.truetype("arial.ttf", font_size)
+    except:
+        return ImageFont.load_default()
 
 def generate_placeholder_image(movie_title, image_type, output_path):
     """Generate a placeholder image when download fails"""
+    started = time.monotonic()
     try:
         # For featured images, create a portrait (poster-like) image
         width = 600
         height = 900
         
-        # Create a gradient background
-        image = Image.new('RGB', (width, height), color=(16, 16, 24))
+        # Start from the shared gradient template, only the title is drawn per image
+        image = placeholder_background(width, height).copy()
         draw = ImageDraw.Draw(image)
         
-        # Add some visual interest with gradient
-        for y in range(height):
-            for x in range(width):
-                # Add some noise and gradient
-                noise = random.randint(-10, 10)
-                gradient = int(y / height * 40)
-                r = min(255, 16 + gradient + noise)
-                g = min(255, 16 + gradient + noise)
-                b = min(255, 24 + int(gradient * 1.5) + noise)
-                draw.point((x, y), fill=(r, g, b))
-        
         # Add movie title
-        try:
-            font_size = 40
-            font = ImageFont.truetype("arial.ttf", font_size)
-        except:
-            font = ImageFont.load_default()
+        font = placeholder_font()
 
         title = movie_title
         if len(title) > 20:
@@ -316,174 +492,440 @@ def generate_placeholder_image(movie_title, image_type, output_path):
         draw.text((position[0]+2, position[1]+2), title, font=font, fill=(0, 0, 0, 128))
         draw.text(position, title, font=font, fill=(255, 255, 255))
         
-        # Save the image
-        image.save(output_path)
-        print(f"Generated placeholder for {movie_title}")
+        # Save the image; the noise makes PNG compression expensive for little gain
+        image.save(output_path, compress_level=1)
+        metrics = get_metrics()
+        metrics.observe('placeholder', time.monotonic() - started)
+        metrics.add_bytes('placeholders_written', os.path.getsize(output_path))
+        log(f"Generated placeholder for {movie_title}")
         return output_path
     
     except Exception as e:
         print(f"Error generating placeholder: {str(e)}")
         return None
 
-def upload_to_firebase(bucket, local_path, movie_title, image_type):
-    """Upload image to Firebase Storage and return public URL"""
+def upload_to_firebase(bucket, local_path, movie_title, image_type, incremental=None, immutable=None, slug=None):
+    """
+    Upload image to Firebase Storage and return public URL. Images are stored
+    under movie_images/<slug>/; pass the record ID as slug, since titles repeat.
+    """
+    if incremental is None:
+        incremental = INCREMENTAL_UPLOADS
+    if immutable is None:
+        immutable = IMMUTABLE_UPLOADS
     try:
         if not bucket or not local_path or not os.path.exists(local_path):
             return None
         
         # Create a storage path for the image
-        title_slug = ''.join(c for c in movie_title if c.isalnum() or c.isspace()).strip().replace(' ', '_').lower()[:50]
+        slug = slug or ''.join(c for c in movie_title if c.isalnum() or c.isspace()).strip().replace(' ', '_').lower()[:50]
         extension = os.path.splitext(local_path)[1]
-        storage_path = f"movie_images/{title_slug}/{image_type}{extension}"
+        storage_path = f"movie_images/{slug}/{image_type}{extension}"
+        
+        if immutable:
+            return upload_immutable(bucket, local_path, storage_path, movie_title, image_type)
         
-        # Upload the file
         blob = bucket.blob(storage_path)
-        blob.upload_from_filename(local_path)
+        
+        if incremental:
+            # Skip the upload (and make_public) when the bucket already has these bytes
+            manifest = get_upload_manifest()
+            local_md5 = file_md5_base64(local_path)
+            entry = manifest.get(storage_path)
+            if entry and entry['md5'] == local_md5:
+                get_metrics().count('uploads_skipped')
+                log(f"Unchanged {image_type} image for {movie_title}, skipping upload")
+                return entry['public_url']
+            
+            remote = bucket.get_blob(storage_path)
+            if remote is not None and remote.md5_hash == local_md5:
+                # Uploaded by an earlier run without a manifest
+                manifest.record(storage_path, local_md5, remote.public_url)
+                get_metrics().count('uploads_skipped')
+                log(f"Unchanged {image_type} image for {movie_title} already in bucket, skipping upload")
+                return remote.public_url
+        
+        # Upload the file
+        metrics = get_metrics()
+        with metrics.stage('upload'):
+            blob.upload_from_filename(local_path, content_type=content_type_for(local_path))
+        metrics.add_bytes('uploaded', os.path.getsize(local_path))
         
         # Make the file publicly accessible
-        blob.make_public()
+        with metrics.stage('make_public'):
+            blob.make_public()
+        
+        if incremental:
+            manifest.record(storage_path, local_md5, blob.public_url)
         
-        print(f"Uploaded {image_type} image for {movie_title}")
+        log(f"Uploaded {image_type} image for {movie_title}")
         return blob.public_url
     except Exception as e:
         print(f"Error uploading {local_path} to Firebase Storage: {str(e)}")
         return None
 
-def process_movies_json():
+def upload_immutable(bucket, local_path, storage_path, movie_title, image_type):
+    """
+    Upload to a path containing the content hash. An object at that path can
+    only ever hold these bytes, so an existing one is reused as-is.
+    """
+    manifest = get_upload_manifest()
+    metrics = get_metrics()
+    hashed_path = immutable_path(storage_path, local_path)
+    alias_url = bucket.blob(storage_path).public_url
+    
+    entry = manifest.get(hashed_path)
+    if entry:
+        metrics.count('uploads_skipped')
+        log(f"Unchanged {image_type} image for {movie_title}, skipping upload")
+        return entry['public_url']
+    
+    local_md5 = file_md5_base64(local_path)
+    remote = bucket.get_blob(hashed_path)
+    if remote is not None:
+        manifest.record(hashed_path, local_md5, remote.public_url, alias_url)
+        metrics.count('uploads_skipped')
+        log(f"Unchanged {image_type} image for {movie_title} already in bucket, skipping upload")
+        return remote.public_url
+    
+    blob = bucket.blob(hashed_path)
+    blob.cache_control = IMMUTABLE_CACHE_CONTROL
+    with metrics.stage('upload'):
+        blob.upload_from_filename(local_path, content_type=content_type_for(local_path))
+    metrics.add_bytes('uploaded', os.path.getsize(local_path))
+    with metrics.stage('make_public'):
+        blob.make_public()
+    manifest.record(hashed_path, local_md5, blob.public_url, alias_url)
+    
+    log(f"Uploaded {image_type} image for {movie_title} to {hashed_path}")
+    return blob.public_url
+
+def map_in_order(executor, fn, items, max_pending):
+    """Run fn over items on the executor and yield the results in input order"""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def process_image(bucket, url, title, image_type, index=0, transcode=None, slug=None):
+    """
+    Download a single image and upload it to Firebase. Returns the public URL,
+    {variant: {url, width, height}} of the WebP sizes when transcoding, and
+    whether the real image (not a placeholder) made it to the bucket.
+    """
+    if transcode is None:
+        transcode = TRANSCODE_VARIANTS
+    local_path, placeholder = download_image(url, title, image_type, index)
+    if not local_path:
+        return None, None, False
+    
+    variant_job = None
+    if transcode:
+        variant_job = get_transcode_pool().submit(transcode_variants, local_path)
+    
+    firebase_url = upload_to_firebase(bucket, local_path, title, image_type, slug=slug)
+    resolved = bool(firebase_url) and not placeholder
+    if not firebase_url or not variant_job:
+        return firebase_url, None, resolved
+    
+    variants = {}
+    try:
+        with get_metrics().stage('transcode_wait'):
+            transcoded = variant_job.result()
+        for variant in transcoded:
+            variant_url = upload_to_firebase(bucket, variant['path'], title, f"{image_type}_{variant['name']}",
+                                             slug=slug)
+            if variant_url:
+                variants[variant['name']] = {
+                    'url': variant_url,
+                    'width': variant['width'],
+                    'height': variant['height']
+                }
+    except Exception as e:
+        print(f"Error transcoding {image_type} image for {title}: {str(e)}")
+    return firebase_url, variants or None, resolved
+
+def process_movie(bucket, image_pool, i, movie, rid=None):
+    """
+    Process the images of a single movie. Returns the updated record and
+    whether every image ended up in the bucket.
+    """
+    try:
+        title = movie.get('title', f"Movie {i+1}")
+        slug = rid or record_id(movie, i)
+        log(f"Processing #{i+1}: {title}")
+        
+        updated_movie = movie.copy()
+        
+        # Start featured and main image in parallel
+        jobs = {}
+        for key, image_type in (('featured_image', 'featured'), ('image', 'main')):
+            image_url = movie.get(key)
+            if image_url and is_valid_image_url(image_url):
+                jobs[key] = image_pool.submit(process_image, bucket, image_url, title, image_type, slug=slug)
+        
+        complete = True
+        for key, job in jobs.items():
+            firebase_url, variants, resolved = job.result()
+            if firebase_url:
+                updated_movie[key] = firebase_url
+                log(f"✓ Updated {key} URL for {title}")
+            if not resolved:
+                complete = False
+            if variants:
+                updated_movie[f"{key}_variants"] = variants
+        
+        return updated_movie, complete
+    
+    except Exception as e:
+        print(f"Error processing movie {i+1}: {str(e)}")
+        # Still return the original movie to avoid data loss
+        return movie, False
+
+def process_show(bucket, image_pool, i, show, rid=None):
+    """
+    Process the featured image and screenshots of a single show. Returns the
+    updated record and whether every image ended up in the bucket.
+    """
+    try:
+        title = show.get('title', f"Series {i+1}")
+        slug = rid or record_id(show, i)
+        log(f"Processing #{i+1}: {title}")
+        
+        updated_show = show.copy()
+        
+        featured_job = None
+        featured_image = show.get('featured_image')
+        if featured_image and is_valid_image_url(featured_image):
+            featured_job = image_pool.submit(process_image, bucket, featured_image, title, 'featured', slug=slug)
+        
+        # Process screenshots (extract individual URLs and process separately)
+        screenshot_jobs = []
+        screenshots = show.get('movie_screenshots')
+        if screenshots and isinstance(screenshots, str):
+            # Extract image URLs from the HTML
+            img_urls = re.findall(r'src="([^"]+)"', screenshots)
+            valid_img_urls = [url for url in img_urls if is_valid_image_url(url)]
+            
+            for idx, img_url in enumerate(valid_img_urls):
+                screenshot_jobs.append(
+                    image_pool.submit(process_image, bucket, img_url, title, f'screenshot_{idx}', idx, slug=slug)
+                )
+        
+        complete = True
+        if featured_job:
+            firebase_url, variants, resolved = featured_job.result()
+            if firebase_url:
+                updated_show['featured_image'] = firebase_url
+                log(f"✓ Updated featured image URL for {title}")
+            if not resolved:
+                complete = False
+            if variants:
+                updated_show['featured_image_variants'] = variants
+        
+        # Collect screenshots in their original order
+        processed_screenshots = []
+        screenshot_variants = []
+        for job in screenshot_jobs:
+            firebase_url, variants, resolved = job.result()
+            if firebase_url:
+                processed_screenshots.append(f'<img src="{firebase_url}">')
+                screenshot_variants.append(variants or {})
+            if not resolved:
+                complete = False
+        
+        if processed_screenshots:
+            updated_show['movie_screenshots'] = ' '.join(processed_screenshots)
+            if any(screenshot_variants):
+                updated_show['screenshot_variants'] = screenshot_variants
+            log(f"✓ Updated {len(processed_screenshots)} screenshots for {title}")
+        
+        return updated_show, complete
+    
+    except Exception as e:
+        print(f"Error processing series {i+1}: {str(e)}")
+        # Still return the original series to avoid data loss
+        return show, False
+
+def load_unchanged(input_file, output_file, manifest, carried_file):
+    """
+    Find the input records whose fingerprint matches the previous run's manifest
+    and copy their previous output to carried_file, keyed by record ID. Returns
+    a JournalIndex over that copy, so the records are read back from disk one
+    at a time instead of being held in memory for the whole run.
+    """
+    unchanged = set()
+    if manifest and os.path.exists(output_file):
+        for i, rid, record in iter_with_ids(iter_json_array(input_file)):
+            if manifest.get(rid) == record_fingerprint(record):
+                unchanged.add(rid)
+    with ProgressJournal(carried_file) as journal:
+        if unchanged:
+            for i, rid, record in iter_with_ids(iter_json_array(output_file)):
+                if rid in unchanged:
+                    journal.append(rid, record)
+    return load_journal(carried_file)
+
+def process_catalog(label, process_record, bucket, input_file, output_file, journal_file,
+                    max_workers, image_workers, resume, progress_every,
+                    incremental=False, manifest_file=None):
+    """
+    Stream records from input_file through process_record on a worker pool and
+    stream the results to output_file in input order. process_record(bucket,
+    image_pool, i, record, rid) returns
+    (record, complete); complete records are journaled and fingerprinted, and
+    with resume, records already in the journal are reused as-is.
+    With incremental, records whose content didn't change since the run that
+    wrote manifest_file are carried over from the previous output_file.
+    """
+    journaled = load_journal(journal_file) if resume else None
+    if journaled is not None:
+        print(f"Resuming: {len(journaled)} {label} already in {journal_file}")
+    
+    carried = None
+    carried_file = f"{os.path.splitext(journal_file)[0]}_carried.jsonl"
+    if incremental:
+        carried = load_unchanged(input_file, output_file, load_manifest(manifest_file), carried_file)
+        print(f"Incremental: {len(carried)} unchanged {label} carried over from {output_file}")
+    fingerprints = {}
+    # Carried-over records may still link to fixed paths uploaded before IMMUTABLE_UPLOADS
+    url_map = get_upload_manifest().alias_urls() if IMMUTABLE_UPLOADS else None
+    metrics = get_metrics()
+    
+    def process(item):
+        i, rid, record = item
+        fingerprint = record_fingerprint(record)
+        if carried is not None and rid in carried:
+            metrics.count(f"{label}_carried_over")
+            return rid, fingerprint, rewrite_urls(carried.get(rid), url_map), False
+        # Titles repeat in the inputs, so the journal is keyed by record ID (silo, silo~2)
+        if journaled is not None and rid in journaled:
+            metrics.count(f"{label}_resumed")
+            return rid, fingerprint, journaled.get(rid), False
+        with metrics.stage(f"{label}_record"):
+            updated, complete = process_record(bucket, image_pool, i, record, rid)
+        # Records with an image that didn't make it to the bucket are retried next run
+        if not complete:
+            metrics.count(f"{label}_incomplete")
+        return rid, fingerprint if complete else None, updated, True
+    
+    processed = 0
+    start_race_pool(image_workers)
+    try:
+        with ProgressJournal(journal_file, resume=resume) as journal, \
+                JsonArrayWriter(output_file) as writer, \
+                ThreadPoolExecutor(max_workers=max_workers) as record_pool, \
+                ThreadPoolExecutor(max_workers=image_workers) as image_pool:
+            records = iter_with_ids(iter_json_array(input_file))
+            for rid, fingerprint, updated, fresh in map_in_order(record_pool, process, records, max_workers * 2):
+                if fresh:
+                    if fingerprint:
+                        journal.append(rid, updated)
+                    processed += 1
+                    if processed % progress_every == 0:
+                        print(f"✅ Progress journaled: {processed} {label} processed")
+                if fingerprint:
+                    fingerprints[rid] = fingerprint
+                writer.write(updated)
+                metrics.item_done(label)
+            total = writer.count
+    finally:
+        if journaled is not None:
+            journaled.close()
+        if carried is not None:
+            carried.close()
+            os.remove(carried_file)
+        shutdown_race_pool()
+        shutdown_transcode_pool()
+    
+    if manifest_file:
+        save_manifest(manifest_file, fingerprints)
+    print(f"Processed {processed} of {total} {label}")
+    return total
+
+def write_run_report():
+    """Write the collected pipeline metrics as JSON (and Prometheus text when configured)"""
+    metrics = get_metrics()
+    report = metrics.write_json()
+    if PROMETHEUS_FILE:
+        metrics.write_prometheus(PROMETHEUS_FILE)
+    for kind, items in report['items'].items():
+        print(f"📊 {items['count']} {kind} in {report['elapsed_seconds']:.1f}s ({items['per_second']:.2f}/s), "
+              f"report in {pipeline_metrics.REPORT_FILE}")
+    return report
+
+def process_movies_json(max_workers=MAX_WORKERS, image_workers=IMAGE_WORKERS, resume=False,
+                        input_file="src/data/movies_ready_for_firebase.json",
+                        output_file="src/data/movies_with_firebase_urls.json",
+                        journal_file=os.path.join('temp_images', 'movies_journal.jsonl'),
+                        bucket=None, incremental=False,
+                        manifest_file=os.path.join('temp_images', 'movies_manifest.json'),
+                        export_dir=CATALOG_EXPORT_DIR):
     """Process the movies JSON file, download images and upload to Firebase"""
-    # First get a valid bucket connection
-    bucket = refresh_firebase_credentials()
+    # Every run reports its own numbers, even several in one process
+    reset_metrics()
+    
+    # First get a valid bucket connection (a stand-in like fake_storage.FakeBucket can be passed in)
+    bucket = bucket or refresh_firebase_credentials()
     if not bucket:
         print("❌ ERROR: Failed to connect to Firebase Storage")
         return
     
-    # Load the JSON file
-    input_file = "src/data/firebase_ready_series.json"
+    # Movies are streamed from the input and written out as they finish
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            movies = json.load(f)
-        print(f"Loaded {len(movies)} movies from JSON file")
+        process_catalog("movies", process_movie, bucket, input_file, output_file, journal_file,
+                        max_workers, image_workers, resume, progress_every=10,
+                        incremental=incremental, manifest_file=manifest_file)
     except Exception as e:
-        print(f"Error loading JSON file: {str(e)}")
+        print(f"Error processing {input_file}: {str(e)}")
         return
     
-    # Process each movie
-    updated_movies = []
-    for i, movie in enumerate(movies):
-        try:
-            title = movie.get('title', f"Movie {i+1}")
-            print(f"Processing {i+1}/{len(movies)}: {title}")
-            
-            updated_movie = movie.copy()
-            
-            # Process featured image if available
-            featured_image = movie.get('featured_image')
-            if featured_image:
-                local_path = download_image(featured_image, title, 'featured')
-                if local_path:
-                    firebase_url = upload_to_firebase(bucket, local_path, title, 'featured')
-                    if firebase_url:
-                        updated_movie['featured_image'] = firebase_url
-                        print(f"✓ Updated featured image URL")
-            
-            # Process main image if available
-            main_image = movie.get('image')
-            if main_image:
-                local_path = download_image(main_image, title, 'main')
-                if local_path:
-                    firebase_url = upload_to_firebase(bucket, local_path, title, 'main')
-                    if firebase_url:
-                        updated_movie['image'] = firebase_url
-                        print(f"✓ Updated main image URL")
-            
-            updated_movies.append(updated_movie)
-            
-            # Save progress periodically
-            if (i+1) % 10 == 0 or i+1 == len(movies):
-                output_file = "src/data/series.json"
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(updated_movies, f, indent=2)
-                print(f"✅ Progress saved: {i+1}/{len(movies)} movies processed")
-        
-        except Exception as e:
-            print(f"Error processing movie {i+1}: {str(e)}")
-            # Still add the original movie to avoid data loss
-            updated_movies.append(movie)
-    
-    print("✅ All movies processed and saved to movies_with_firebase_urls.json")
+    print_connection_stats()
+    get_scoreboard().save()
+    get_upload_manifest().save()
+    write_run_report()
+    print(f"✅ All movies processed and saved to {output_file}")
+    if export_dir:
+        export_catalog(output_file, os.path.join(export_dir, 'movies'), 'movies')
 
-def process_series_json():
+def process_series_json(max_workers=MAX_WORKERS, image_workers=IMAGE_WORKERS, resume=False,
+                        input_file="src/data/series_ready_for_db.json",
+                        output_file="src/data/series.json",
+                        journal_file=os.path.join('temp_images', 'series_journal.jsonl'),
+                        bucket=None, incremental=False,
+                        manifest_file=os.path.join('temp_images', 'series_manifest.json'),
+                        export_dir=CATALOG_EXPORT_DIR):
     """Process the series JSON file, download images and upload to Firebase"""
-    # First get a valid bucket connection
-    bucket = refresh_firebase_credentials()
+    # Every run reports its own numbers, even several in one process
+    reset_metrics()
+    
+    # First get a valid bucket connection (a stand-in like fake_storage.FakeBucket can be passed in)
+    bucket = bucket or refresh_firebase_credentials()
     if not bucket:
         print("❌ ERROR: Failed to connect to Firebase Storage")
         return
     
-    # Load the JSON file
-    input_file = "src/data/series_ready_for_db.json"
+    # Shows are streamed from the input and written out as they finish
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            series = json.load(f)
-        print(f"Loaded {len(series)} series from JSON file")
+        process_catalog("series", process_show, bucket, input_file, output_file, journal_file,
+                        max_workers, image_workers, resume, progress_every=5,
+                        incremental=incremental, manifest_file=manifest_file)
     except Exception as e:
-        print(f"Error loading JSON file: {str(e)}")
+        print(f"Error processing {input_file}: {str(e)}")
         return
     
-    # Process each series
-    updated_series = []
-    for i, show in enumerate(series):
-        try:
-            title = show.get('title', f"Series {i+1}")
-            print(f"Processing {i+1}/{len(series)}: {title}")
-            
-            updated_show = show.copy()
-            
-            # Process featured image if available
-            featured_image = show.get('featured_image')
-            if featured_image:
-                local_path = download_image(featured_image, title, 'featured')
-                if local_path:
-                    firebase_url = upload_to_firebase(bucket, local_path, title, 'featured')
-                    if firebase_url:
-                        updated_show['featured_image'] = firebase_url
-                        print(f"✓ Updated featured image URL")
-            
-            # Process screenshots (extract individual URLs and process separately)
-            screenshots = show.get('movie_screenshots')
-            if screenshots and isinstance(screenshots, str):
-                # Extract image URLs from the HTML
-                import re
-                img_urls = re.findall(r'src="([^"]+)"', screenshots)
-                valid_img_urls = [url for url in img_urls if is_valid_image_url(url)]
-                
-                processed_screenshots = []
-                for idx, img_url in enumerate(valid_img_urls):
-                    local_path = download_image(img_url, title, f'screenshot_{idx}', idx)
-                    if local_path:
-                        firebase_url = upload_to_firebase(bucket, local_path, title, f'screenshot_{idx}')
-                        if firebase_url:
-                            processed_screenshots.append(f'<img src="{firebase_url}">')
-                
-                if processed_screenshots:
-                    updated_show['movie_screenshots'] = ' '.join(processed_screenshots)
-                    print(f"✓ Updated {len(processed_screenshots)} screenshots")
-            
-            updated_series.append(updated_show)
-            
-            # Save progress periodically
-            if (i+1) % 5 == 0 or i+1 == len(series):
-                output_file = "src/data/series.json"
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(updated_series, f, indent=2)
-                print(f"✅ Progress saved: {i+1}/{len(series)} series processed")
-        
-        except Exception as e:
-            print(f"Error processing series {i+1}: {str(e)}")
-            # Still add the original series to avoid data loss
-            updated_series.append(show)
-    
-    print("✅ All series processed and saved to series.json")
+    print_connection_stats()
+    get_scoreboard().save()
+    get_upload_manifest().save()
+    write_run_report()
+    print(f"✅ All series processed and saved to {output_file}")
+    if export_dir:
+        export_catalog(output_file, os.path.join(export_dir, 'series'), 'series')
 
 if __name__ == "__main__":
-    process_series_json()
\ No newline at end of file
+    # Kept for old habits; the subcommands live in pipeline_cli.py
+    from pipeline_cli import main
+    main(default_command='series')
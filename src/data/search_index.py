@@ -0,0 +1,259 @@
+"""
+Build a precomputed search index for the catalog, so the frontend can answer
+title searches, type-ahead and category filters from static files instead of
+querying at request time.
+
+Output (under OUTPUT_DIR):
+    index.json           manifest: document count, shard list and file names
+    docs.json            [{id, key, type, title, year, image}] by document number
+    facets.json          {"year"|"quality"|"category": {value: [doc, ...]}}
+    terms-<c>.json       {"terms": {token: [doc, ...]}, "prefixes": {prefix: [token, ...]}}
+                         for every token starting with character c
+
+Posting lists are sorted document numbers, so filters are list intersections.
+A client loads index.json, docs.json and facets.json once, then only the term
+shard for the first character of what the user is typing.
+
+    python src/data/search_index.py [--output public/search-index]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+
+from json_stream import iter_json_array
+from series_normalizer import normalize_category, series_id
+
+SERIES_FILE = "src/data/series.json"
+MOVIE_FILES = [
+    "src/data/movies_with_firebase_urls.json",
+    "src/data/movies_firebase_ready.json",
+    "src/data/movies_ready_for_firebase.json"
+]
+OUTPUT_DIR = os.path.join('public', 'search-index')
+
+# Prefixes up to this length get a precomputed completion list
+MAX_PREFIX_LENGTH = 6
+# Completions kept per prefix, most frequent tokens first
+TYPEAHEAD_SIZE = 10
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+YEAR_RE = re.compile(r'^(19|20)\d{2}$')
+TITLE_YEAR_RE = re.compile(r'\((\d{4})\)')
+QUALITY_RE = re.compile(r'^(\d{3,4}p)\b', re.IGNORECASE)
+
+def fold(text):
+    """Lowercase and strip accents ('Pokémon' -> 'pokemon')"""
+    text = unicodedata.normalize('NFKD', str(text))
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower()
+
+def tokenize(text):
+    return [sys.intern(token) for token in TOKEN_RE.findall(fold(text))]
+
+def shard_key(token):
+    return token[0] if token and token[0].isalnum() else '_'
+
+def classify_category(value):
+    """Sort a cleaned category into the year, quality or category facet"""
+    if YEAR_RE.match(value):
+        return 'year', value
+    quality = QUALITY_RE.match(value)
+    if quality:
+        return 'quality', quality.group(1).lower()
+    return 'category', value
+
+def iter_catalog(series_file=SERIES_FILE, movie_files=MOVIE_FILES):
+    """Yield (type, record) for every series and every distinct movie title"""
+    if series_file and os.path.exists(series_file):
+        for record in iter_json_array(series_file):
+            yield 'series', record
+    seen = set()
+    for path in movie_files or []:
+        if not os.path.exists(path):
+            continue
+        for record in iter_json_array(path):
+            # The movie files overlap; the first file listing a title wins
+            key = series_id(str(record.get('title', '')))
+            if key and key not in seen:
+                seen.add(key)
+                yield 'movie', record
+
+def build_index(catalog):
+    """Return (docs, terms, facets) for an iterable of (type, record)"""
+    docs = []
+    terms = defaultdict(list)
+    facets = {'year': defaultdict(list), 'quality': defaultdict(list), 'category': defaultdict(list)}
+
+    for doc, (kind, record) in enumerate(catalog):
+        title = str(record.get('title', ''))
+        values = defaultdict(set)
+        for value in normalize_category(record.get('category')):
+            facet, value = classify_category(value)
+            values[facet].add(value)
+        if not values['year']:
+            title_year = TITLE_YEAR_RE.search(title)
+            if title_year:
+                values['year'].add(title_year.group(1))
+
+        docs.append({
+            'id': doc,
+            'key': record.get('id') or series_id(title),
+            'type': kind,
+            'title': title,
+            'year': max(values['year']) if values['year'] else None,
+            'image': record.get('featured_image')
+        })
+        # Documents are numbered in order, so every posting list stays sorted
+        for token in dict.fromkeys(tokenize(title)):
+            terms[token].append(doc)
+        for facet, facet_values in values.items():
+            for value in facet_values:
+                facets[facet][value].append(doc)
+
+    return docs, dict(terms), {facet: dict(sorted(postings.items())) for facet, postings in facets.items()}
+
+def build_prefixes(terms):
+    """prefix -> most frequent tokens starting with it, for type-ahead"""
+    candidates = defaultdict(list)
+    for token, postings in terms.items():
+        for length in range(1, min(len(token), MAX_PREFIX_LENGTH) + 1):
+            candidates[token[:length]].append((-len(postings), token))
+    return {prefix: [token for _, token in sorted(tokens)[:TYPEAHEAD_SIZE]]
+            for prefix, tokens in sorted(candidates.items())}
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    return os.path.getsize(path)
+
+def write_index(docs, terms, facets, output_dir=OUTPUT_DIR):
+    """Write the index files and return the manifest"""
+    os.makedirs(output_dir, exist_ok=True)
+    prefixes = build_prefixes(terms)
+    shards = defaultdict(lambda: {'terms': {}, 'prefixes': {}})
+    for token in sorted(terms):
+        shards[shard_key(token)]['terms'][token] = terms[token]
+    for prefix, tokens in prefixes.items():
+        shards[shard_key(prefix)]['prefixes'][prefix] = tokens
+
+    manifest = {
+        'version': 1,
+        'documents': len(docs),
+        'max_prefix_length': MAX_PREFIX_LENGTH,
+        'docs': 'docs.json',
+        'facets': 'facets.json',
+        'shards': {}
+    }
+    total = write_json(os.path.join(output_dir, 'docs.json'), docs)
+    total += write_json(os.path.join(output_dir, 'facets.json'), facets)
+    for key, shard in sorted(shards.items()):
+        name = f"terms-{key}.json"
+        size = write_json(os.path.join(output_dir, name), shard)
+        manifest['shards'][key] = {'file': name, 'terms': len(shard['terms']), 'bytes': size}
+        total += size
+    manifest['bytes'] = total
+    write_json(os.path.join(output_dir, 'index.json'), manifest)
+    return manifest
+
+def intersect(a, b):
+    """Intersection of two sorted posting lists"""
+    result = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        if a[i] == b[j]:
+            result.append(a[i])
+            i += 1
+            j += 1
+        elif a[i] < b[j]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+class SearchIndex:
+    """
+    Reads an exported index the way the frontend would: the manifest, docs
+    and facets up front, term shards on first use.
+    """
+
+    def __init__(self, output_dir=OUTPUT_DIR):
+        self.output_dir = output_dir
+        self.manifest = self._load('index.json')
+        self.docs = self._load(self.manifest['docs'])
+        self.facets = self._load(self.manifest['facets'])
+        self._shards = {}
+
+    def _load(self, name):
+        with open(os.path.join(self.output_dir, name), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def shard(self, token):
+        key = shard_key(token)
+        if key not in self._shards:
+            entry = self.manifest['shards'].get(key)
+            shard = self._load(entry['file']) if entry else {'terms': {}, 'prefixes': {}}
+            # Shards are written in token order
+            shard['sorted_terms'] = list(shard['terms'])
+            self._shards[key] = shard
+        return self._shards[key]
+
+    def complete(self, prefix):
+        """Type-ahead: tokens starting with prefix, most frequent first when precomputed"""
+        shard = self.shard(prefix)
+        if len(prefix) <= self.manifest['max_prefix_length']:
+            return shard['prefixes'].get(prefix, [])
+        return self._tokens_with_prefix(shard, prefix)[:TYPEAHEAD_SIZE]
+
+    def _tokens_with_prefix(self, shard, prefix):
+        tokens = shard['sorted_terms']
+        start = bisect_left(tokens, prefix)
+        end = bisect_left(tokens, prefix + '\uffff', start)
+        return tokens[start:end]
+
+    def postings(self, token, prefix=False):
+        shard = self.shard(token)
+        if not prefix:
+            return shard['terms'].get(token, [])
+        docs = set()
+        for t in self._tokens_with_prefix(shard, token):
+            docs.update(shard['terms'][t])
+        return sorted(docs)
+
+    def search(self, query, limit=20, **filters):
+        """
+        Documents whose title contains every query token, the last one as a
+        prefix (so results update while typing), narrowed by facet filters
+        such as year='2024' or category='Netflix'.
+        """
+        tokens = tokenize(query)
+        lists = [self.postings(token, prefix=(n == len(tokens) - 1)) for n, token in enumerate(tokens)]
+        for facet, value in filters.items():
+            lists.append(self.facets.get(facet, {}).get(value, []))
+        if not lists:
+            return []
+        lists.sort(key=len)
+        result = lists[0]
+        for postings in lists[1:]:
+            if not result:
+                break
+            result = intersect(result, postings)
+        return [self.docs[doc] for doc in result[:limit]]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--series', default=SERIES_FILE)
+    parser.add_argument('--movies', nargs='*', default=MOVIE_FILES)
+    parser.add_argument('--output', default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    docs, terms, facets = build_index(iter_catalog(args.series, args.movies))
+    manifest = write_index(docs, terms, facets, args.output)
+    print(f"✅ Indexed {len(docs)} titles ({len(terms)} tokens, {len(manifest['shards'])} shards, "
+          f"{manifest['bytes'] / 1024:.0f} KB) into {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Turn raw series records (series_ready_for_db.json) into the structured
+seasons/episodes shape used by series.json.
+
+A raw record stores every season as free text:
+
+    "Season 1": "Show Season 1 ... WEB-DL |\nEpisode 1 : <url>,720p 10Bit,292.19 MB : <url>,1080p,1.2 GB\n..."
+
+and may also hold whole-season packs ("Season 1 : <url>,480p,2.02 GB : ...").
+
+    python src/data/series_normalizer.py [input] [output] [--workers N] [--compact]
+"""
+import argparse
+import os
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from json_stream import iter_json_array, JsonArrayWriter
+
+SEASON_KEY_RE = re.compile(r'^Season\s+(\d+)$')
+LINE_RE = re.compile(r'^\s*(Episode|Season)\s+([^:]+?)\s*:\s*(.*)$')
+GROUP_SPLIT_RE = re.compile(r'\s+:\s+')
+SIZE_RE = re.compile(r'^(\d+(?:\.\d+)?)\s*(B|KB|MB|GB|TB)$', re.IGNORECASE)
+QUALITY_RE = re.compile(r'^\d{3,4}p\b', re.IGNORECASE)
+
+SIZE_UNITS = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3, 'TB': 1024 ** 4}
+
+# Records handed to a worker process at a time
+BATCH_SIZE = 64
+
+def parse_size(text):
+    """'292.19 MB' -> bytes, or None when the text isn't a size"""
+    match = SIZE_RE.match(text.strip())
+    if not match:
+        return None
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+def parse_link_group(group):
+    """
+    Parse one 'url,quality,size' group. The fields are matched by shape rather
+    than position because some records have them out of order or missing.
+    """
+    link = quality = size = None
+    for part in group.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if part.startswith('http'):
+            link = link or part
+        elif quality is None and QUALITY_RE.match(part):
+            quality = sys.intern(part)
+        elif size is None and SIZE_RE.match(part):
+            size = part
+    if not (link or quality or size):
+        return None
+    return {'link': link or '', 'quality': quality, 'size': size, 'size_bytes': parse_size(size) if size else None}
+
+def parse_links(text):
+    links = (parse_link_group(group) for group in GROUP_SPLIT_RE.split(text))
+    return [link for link in links if link]
+
+def normalize_season(number, text):
+    """Parse the free text of one season into {id, season, episodes, packs}"""
+    episodes = []
+    packs = []
+    seen_ids = set()
+    for line in text.split('\n'):
+        match = LINE_RE.match(line)
+        if not match:
+            # Release header lines ("... WEB-DL |") carry no links
+            continue
+        kind, label, rest = match.groups()
+        links = parse_links(rest)
+        if kind == 'Season':
+            packs.extend(link for link in links if link['link'])
+            continue
+        if not links:
+            continue
+        episode_id = f"episode_{label}".replace(' ', '_').lower()
+        if episode_id in seen_ids:
+            episode_id = f"{episode_id}_{len(episodes) + 1}"
+        seen_ids.add(episode_id)
+        # Episodes listed without a working link are kept so the numbering stays intact
+        first = next((link for link in links if link['link']), links[0])
+        episodes.append({
+            'id': episode_id,
+            'episode': label,
+            'quality': first['quality'],
+            'size': first['size'],
+            'size_bytes': first['size_bytes'],
+            'link': first['link'],
+            'links': [link for link in links if link['link']]
+        })
+    season = {'id': f"season_{number}", 'season': number, 'episodes': episodes}
+    if packs:
+        season['packs'] = packs
+    return season
+
+def normalize_category(category):
+    """' 2023' style comma strings (or lists) -> trimmed, interned, de-duplicated list"""
+    if isinstance(category, str):
+        category = category.split(',')
+    result = []
+    for item in category or []:
+        item = str(item).strip()
+        if item and item not in result:
+            result.append(sys.intern(item))
+    return result
+
+def series_id(title):
+    """Same ID scheme as the existing series.json (lowercase, spaces to underscores)"""
+    return title.strip().lower().replace(' ', '_')
+
+def normalize_series_record(raw):
+    """Convert one raw record into the series.json shape"""
+    record = {}
+    seasons = []
+    for key, value in raw.items():
+        season_match = SEASON_KEY_RE.match(key)
+        if season_match:
+            if value:
+                seasons.append(normalize_season(int(season_match.group(1)), value))
+        elif key == 'category':
+            record['category'] = normalize_category(value)
+        else:
+            record[key] = value
+    title = str(raw.get('title') or '')
+    record = {'id': series_id(title), **record}
+    record['seasons'] = sorted(seasons, key=lambda season: season['season'])
+    return record
+
+def normalize_batch(records):
+    return [normalize_series_record(raw) for raw in records]
+
+def _batches(records, size):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def iter_normalized(records, workers=None, batch_size=BATCH_SIZE):
+    """
+    Normalize a stream of raw records in input order. With workers > 1 the
+    batches are spread over a process pool, with a bounded number in flight.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for raw in records:
+            yield normalize_series_record(raw)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for batch in _batches(records, batch_size):
+            pending.append(pool.submit(normalize_batch, batch))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+def normalize_file(input_file, output_file, workers=None, wrapper_key='series', indent=2):
+    """Stream a raw dump through the normalizer into a {"series": [...]} file"""
+    with JsonArrayWriter(output_file, wrapper_key=wrapper_key, indent=indent) as writer:
+        for record in iter_normalized(iter_json_array(input_file), workers):
+            writer.write(record)
+    return writer.count
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', nargs='?', default="src/data/series_ready_for_db.json")
+    parser.add_argument('output', nargs='?', default="src/data/series_normalized.json")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--compact', action='store_true', help="one record per line instead of indented output")
+    args = parser.parse_args()
+
+    count = normalize_file(args.input, args.output, args.workers, indent=None if args.compact else 2)
+    print(f"✅ Normalized {count} series into {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import threading
+import time
+
+from data import upload_movies
+
+class FakeFirestore:
+    """Enough of the Firestore client for upload_movies; a batch commits after its slowest document's delay"""
+
+    def __init__(self):
+        self.documents = {}
+        self._lock = threading.Lock()
+
+    def collection(self, name):
+        return self
+
+    def document(self, doc_id):
+        return doc_id
+
+    def batch(self):
+        return FakeBatch(self)
+
+class FakeBatch:
+    def __init__(self, db):
+        self.db = db
+        self.writes = []
+
+    def set(self, ref, data):
+        self.writes.append((ref, data))
+
+    def commit(self):
+        time.sleep(max(data.get('delay', 0) for _, data in self.writes))
+        with self.db._lock:
+            self.db.documents.update(self.writes)
+
+def test_movies_sharing_a_title_get_their_own_documents():
+    movies = [
+        {'title': 'Silo', 'version': 1, 'delay': 0.3},
+        {'title': 'Other', 'version': 1},
+        {'title': 'Silo', 'version': 2},
+        {'title': 'Andor', 'version': 1}
+    ]
+    db = FakeFirestore()
+    result = upload_movies(db, iter(movies), batch_size=2, max_in_flight=4)
+    assert result['written'] == 4
+    # Same IDs as the image pipeline's record IDs
+    assert db.documents['silo']['version'] == 1
+    assert db.documents['silo~2']['version'] == 2
+    assert set(db.documents) == {'silo', 'other', 'silo~2', 'andor'}
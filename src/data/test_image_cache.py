@@ -0,0 +1,37 @@
+import io
+import os
+
+from PIL import Image
+
+import image_cache
+from image_cache import ImageCache
+
+def downloaded(tmp_path, name, color):
+    buf = io.BytesIO()
+    Image.new('RGB', (40, 60), color).save(buf, 'PNG')
+    path = tmp_path / name
+    path.write_bytes(buf.getvalue())
+    return str(path)
+
+def test_lookup_forgets_a_file_deleted_from_disk(tmp_path):
+    cache = ImageCache(str(tmp_path / 'cas'), str(tmp_path / 'index.sqlite'))
+    entry = cache.store('https://example.com/a.png', downloaded(tmp_path, 'a.png', (10, 20, 30)))
+    assert cache.lookup('https://example.com/a.png')['path'] == entry['path']
+
+    os.remove(entry['path'])
+    assert cache.lookup('https://example.com/a.png') is None
+    assert cache.total_bytes() == 0
+    # The next download stores it again
+    entry = cache.store('https://example.com/a.png', downloaded(tmp_path, 'a.png', (10, 20, 30)))
+    assert cache.lookup('https://example.com/a.png')['path'] == entry['path']
+
+def test_evict_keeps_images_handed_out_recently(tmp_path, monkeypatch):
+    cache = ImageCache(str(tmp_path / 'cas'), str(tmp_path / 'index.sqlite'), max_bytes=0)
+    entry = cache.store('https://example.com/a.png', downloaded(tmp_path, 'a.png', (10, 20, 30)))
+    # Over budget, but a worker may still be uploading the image
+    assert os.path.exists(entry['path'])
+    assert cache.lookup('https://example.com/a.png')['path'] == entry['path']
+
+    monkeypatch.setattr(image_cache, 'EVICT_GRACE_SECONDS', -1)
+    assert cache.evict() == 1
+    assert not os.path.exists(entry['path'])
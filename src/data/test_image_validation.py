@@ -0,0 +1,57 @@
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from image_validation import HEADER_LIMIT, InvalidImage, StreamingImageValidator
+
+def noisy_image(width, height, mode='RGB'):
+    """Random pixels, so the encoded file stays large"""
+    return Image.frombytes(mode, (width, height), os.urandom(width * height * len(mode)))
+
+def encode(img, image_format, **params):
+    buf = io.BytesIO()
+    img.save(buf, image_format, **params)
+    return buf.getvalue()
+
+def validate(data, chunk_size=8192):
+    validator = StreamingImageValidator(content_length=len(data))
+    for start in range(0, len(data), chunk_size):
+        validator.feed(data[start:start + chunk_size])
+    return validator.finish()
+
+@pytest.mark.parametrize('params', [
+    {'quality': 90},
+    {'lossless': True},
+    {'quality': 90, 'exif': Image.Exif().tobytes()},
+], ids=['lossy', 'lossless', 'extended'])
+def test_webp_larger_than_header_limit(params):
+    data = encode(noisy_image(600, 900), 'WEBP', **params)
+    assert len(data) > HEADER_LIMIT
+    info = validate(data)
+    assert (info['format'], info['width'], info['height']) == ('WEBP', 600, 900)
+
+def test_webp_with_alpha():
+    info = validate(encode(noisy_image(1280, 720, 'RGBA'), 'WEBP', quality=80))
+    assert (info['width'], info['height']) == (1280, 720)
+
+def test_avif_dimensions():
+    info = validate(encode(noisy_image(320, 240), 'AVIF', quality=80))
+    assert (info['format'], info['width'], info['height']) == ('AVIF', 320, 240)
+
+def test_large_jpeg():
+    info = validate(encode(noisy_image(1280, 720), 'JPEG', quality=95))
+    assert (info['format'], info['width'], info['height']) == ('JPEG', 1280, 720)
+
+def test_html_is_rejected_on_first_chunk():
+    validator = StreamingImageValidator()
+    with pytest.raises(InvalidImage):
+        validator.feed(b'<!DOCTYPE html><html>' + b' ' * 2000)
+
+def test_truncated_webp_is_rejected():
+    data = encode(noisy_image(600, 900), 'WEBP', quality=90)
+    validator = StreamingImageValidator(content_length=len(data))
+    validator.feed(data[:len(data) // 2])
+    with pytest.raises(InvalidImage):
+        validator.finish()
@@ -0,0 +1,48 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from fake_storage import FakeBucket
+from immutable_storage import sweep
+from upload_manifest import UploadManifest
+
+def put(bucket, tmp_path, name, age_days, data=b'image bytes'):
+    source = tmp_path / 'upload.bin'
+    source.write_bytes(data)
+    blob = bucket.blob(name)
+    blob.upload_from_filename(str(source))
+    blob.time_created = datetime.now(timezone.utc) - timedelta(days=age_days)
+    return blob.public_url
+
+@pytest.fixture
+def bucket_with_history(tmp_path):
+    """
+    A legacy fixed-path object the manifest never saw, plus an image uploaded
+    twice to content-hashed paths (the older version is stale)
+    """
+    bucket = FakeBucket()
+    manifest = UploadManifest(str(tmp_path / 'manifest.json'))
+    legacy_url = put(bucket, tmp_path, 'movie_images/the_visit_2015/featured.jpg', 300)
+    alias_url = bucket.blob('movie_images/silo/featured.jpg').public_url
+    old_url = put(bucket, tmp_path, 'movie_images/silo/featured.aaaa.jpg', 40, b'old')
+    manifest.record('movie_images/silo/featured.aaaa.jpg', 'md5-old', old_url, alias_url)
+    new_url = put(bucket, tmp_path, 'movie_images/silo/featured.bbbb.jpg', 2, b'new')
+    manifest.record('movie_images/silo/featured.bbbb.jpg', 'md5-new', new_url, alias_url)
+    return bucket, manifest, legacy_url, new_url
+
+def test_sweep_without_catalogs_keeps_objects_the_manifest_never_saw(bucket_with_history):
+    bucket, manifest, legacy_url, new_url = bucket_with_history
+    stale = sweep(bucket, manifest, delete=True)
+    assert stale == ['movie_images/silo/featured.aaaa.jpg']
+    assert set(bucket.blobs) == {'movie_images/the_visit_2015/featured.jpg', 'movie_images/silo/featured.bbbb.jpg'}
+
+def test_sweep_with_catalogs_keeps_linked_objects(bucket_with_history, tmp_path):
+    bucket, manifest, legacy_url, new_url = bucket_with_history
+    put(bucket, tmp_path, 'movie_images/gone/featured.jpg', 300)
+    catalog = tmp_path / 'movies.json'
+    catalog.write_text(json.dumps([{'title': 'The Visit', 'featured_image': legacy_url}]))
+
+    stale = sweep(bucket, manifest, catalog_files=[str(catalog)], delete=True)
+    assert sorted(stale) == ['movie_images/gone/featured.jpg', 'movie_images/silo/featured.aaaa.jpg']
+    assert set(bucket.blobs) == {'movie_images/the_visit_2015/featured.jpg', 'movie_images/silo/featured.bbbb.jpg'}
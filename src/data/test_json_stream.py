@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+import json_stream
+from json_stream import JsonArrayWriter, iter_json_array
+
+RECORDS = [
+    {'title': 'Silo', 'rating': 0.25, 'size': 1e-5, 'votes': 12345, 'tags': ['a', 'b'], 'seen': True},
+    {'title': 'Andor', 'rating': -3.5e+2, 'size': 1.5E10, 'votes': 0, 'tags': [], 'seen': None},
+    {'title': 'Ünïcode ✓', 'rating': 7, 'size': 0.125, 'votes': 99, 'tags': ['x'], 'seen': False}
+]
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 7, 64])
+@pytest.mark.parametrize('wrapper_key', [None, 'series'])
+def test_round_trip_with_small_chunks(tmp_path, monkeypatch, chunk_size, wrapper_key):
+    monkeypatch.setattr(json_stream, 'CHUNK_SIZE', chunk_size)
+    path = str(tmp_path / 'catalog.json')
+    with JsonArrayWriter(path, wrapper_key=wrapper_key, indent=None) as writer:
+        for record in RECORDS:
+            writer.write(record)
+    assert list(iter_json_array(path)) == RECORDS
+
+def test_bare_numbers_split_across_chunks(tmp_path, monkeypatch):
+    numbers = [0.25, 10.5, 1e-5, -2.5e+3, 123456789, 0, 3.0]
+    path = tmp_path / 'numbers.json'
+    path.write_text(json.dumps(numbers))
+    for chunk_size in range(1, 12):
+        monkeypatch.setattr(json_stream, 'CHUNK_SIZE', chunk_size)
+        assert list(iter_json_array(str(path))) == numbers
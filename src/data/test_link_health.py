@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from bench_link_health import LinkOrigin, file_size, generate_catalog, is_dead
+from bench_pipeline import offline_adapter_class
+from http_client import PooledHttpClient
+from link_health import LinkHealthCache, scan_catalogs
+
+@pytest.fixture
+def origin():
+    origin = LinkOrigin(latency=0).start()
+    yield origin
+    origin.stop()
+
+def test_scan_writes_health_back_and_uses_the_cache(origin, tmp_path):
+    catalog = tmp_path / 'movies.json'
+    catalog.write_text(json.dumps(generate_catalog(60)))
+    client = PooledHttpClient(max_per_domain=4, pool_size=8,
+                              adapter_class=offline_adapter_class(origin.port, None, set()))
+    cache = LinkHealthCache(str(tmp_path / 'link_health.sqlite'))
+
+    scan_catalogs([str(catalog)], client=client, cache=cache, workers=8)
+    for record in json.loads(catalog.read_text()):
+        for link in record['final_links']:
+            path = link['url'].split('/', 3)[3].split('?')[0]
+            assert link['health']['alive'] is not is_dead(path)
+            if link['health']['alive']:
+                assert link['health']['content_length'] == file_size(path)
+    # Every link on the HEAD-less host needed the range fallback
+    assert origin.requests['GET'] == 30
+
+    requests_made = dict(origin.requests)
+    scan_catalogs([str(catalog)], client=client, cache=cache, workers=8)
+    assert origin.requests == requests_made
+    cache.close()
+
+def test_sizes_are_compared_with_the_declared_size(origin, tmp_path):
+    catalog = tmp_path / 'movies.json'
+    catalog.write_text(json.dumps(generate_catalog(60)))
+    client = PooledHttpClient(adapter_class=offline_adapter_class(origin.port, None, set()))
+    scan_catalogs([str(catalog)], client=client, cache=LinkHealthCache(str(tmp_path / 'c.sqlite')))
+    for record in json.loads(catalog.read_text()):
+        for link in record['final_links']:
+            n = int(link['url'].split('link')[1].split('?')[0])
+            if link['health']['alive']:
+                # generate_catalog doubles the declared size of every 17th link
+                assert link['health']['size_matches'] is (n % 17 != 0)
@@ -0,0 +1,23 @@
+from pipeline_cli import build_parser
+
+def test_movies_and_series_runs_never_share_a_catalog():
+    parser = build_parser()
+    series = parser.parse_args(['series'])
+    movies = parser.parse_args(['movies'])
+    assert movies.input == 'src/data/movies_ready_for_firebase.json'
+    assert movies.output == 'src/data/movies_with_firebase_urls.json'
+    assert {series.input, series.output}.isdisjoint({movies.input, movies.output})
+
+def test_no_transcode_turns_the_variants_off():
+    assert build_parser().parse_args(['series']).no_transcode is False
+    assert build_parser().parse_args(['series', '--no-transcode']).no_transcode is True
+
+def test_force_upload_turns_incremental_uploads_off():
+    assert build_parser().parse_args(['movies']).force_upload is False
+    assert build_parser().parse_args(['movies', '--force-upload']).force_upload is True
+
+def test_mirror_resolution_flags():
+    args = build_parser().parse_args(['series', '--resolution', 'race', '--race-width', '3', '--hedge-delay', '0.5'])
+    assert (args.resolution, args.race_width, args.hedge_delay) == ('race', 3, 0.5)
+    args = build_parser().parse_args(['series'])
+    assert (args.resolution, args.race_width, args.hedge_delay) == (None, None, None)
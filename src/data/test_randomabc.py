@@ -0,0 +1,265 @@
+import json
+import os
+import time
+
+import pytest
+
+import http_client
+import image_cache
+import mirror_scoreboard
+import negative_cache
+import pipeline_metrics
+import randomabc
+import upload_manifest
+from bench_pipeline import HOST_PROFILES, SyntheticOrigin, generate_catalog, offline_adapter_class
+from fake_storage import FakeBucket
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """
+    Run every test in its own directory with fresh shared caches, so
+    temp_images/ and the per-run singletons start empty
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(image_cache, '_cache', None)
+    monkeypatch.setattr(negative_cache, '_negative_cache', None)
+    monkeypatch.setattr(upload_manifest, '_manifest', None)
+    monkeypatch.setattr(mirror_scoreboard, '_scoreboard', None)
+    monkeypatch.setattr(pipeline_metrics, '_metrics', None)
+    return tmp_path
+
+@pytest.fixture
+def origin(monkeypatch):
+    """Local stand-in for the image hosts, with no latency and no random errors"""
+    origin = SyntheticOrigin(latency_scale=0, error_rate=0).start()
+    dead_hosts = {host for host, profile in HOST_PROFILES.items() if profile.get('dead')}
+    client = http_client.PooledHttpClient(adapter_class=offline_adapter_class(origin.port, origin.dead_port, dead_hosts))
+    monkeypatch.setattr(http_client, '_client', client)
+    yield origin
+    origin.stop()
+
+class UnavailableBucket(FakeBucket):
+    """A bucket whose every metadata read fails, like Storage during an outage"""
+
+    def get_blob(self, name):
+        raise RuntimeError("503 Service Unavailable")
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+def read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def run_catalog(process_record, resume=False, incremental=False, bucket=None):
+    return randomabc.process_catalog("series", process_record, bucket, 'input.json', 'output.json',
+                                     'journal.jsonl', max_workers=2, image_workers=2, resume=resume,
+                                     progress_every=100, incremental=incremental, manifest_file='manifest.json')
+
+def test_resume_keeps_duplicate_titles_apart():
+    write_json('input.json', [
+        {'title': 'Silo', 'featured_image': 'https://example.com/a.jpg'},
+        {'title': 'Other', 'featured_image': 'https://example.com/o.jpg'},
+        {'title': 'Silo', 'featured_image': 'https://example.com/b.jpg'}
+    ])
+
+    def mark_done(bucket, image_pool, i, record, rid):
+        return {**record, 'done': i}, True
+
+    run_catalog(mark_done)
+    first = read_json('output.json')
+    assert [r['featured_image'] for r in first] == [
+        'https://example.com/a.jpg', 'https://example.com/o.jpg', 'https://example.com/b.jpg'
+    ]
+
+    def must_not_run(bucket, image_pool, i, record, rid):
+        raise AssertionError(f"{record['title']} should have been resumed from the journal")
+
+    run_catalog(must_not_run, resume=True)
+    assert read_json('output.json') == first
+
+def test_failed_uploads_are_retried_by_incremental_runs(origin):
+    write_json('input.json', generate_catalog('series', 3))
+
+    def run(bucket):
+        randomabc.process_series_json(max_workers=2, image_workers=4, input_file='input.json',
+                                      output_file='output.json', bucket=bucket, incremental=True, export_dir=None)
+
+    run(UnavailableBucket())
+    assert all(r['featured_image'].startswith('https://vegamovies.ps/') for r in read_json('output.json'))
+    assert read_json('temp_images/series_manifest.json') == {}
+
+    bucket = FakeBucket()
+    run(bucket)
+    output = read_json('output.json')
+    assert all(r['featured_image'].startswith('https://storage.googleapis.com/') for r in output)
+    assert 'vegamovies' not in json.dumps(output)
+    assert len(read_json('temp_images/series_manifest.json')) == 3
+
+    uploads = bucket.calls['upload']
+    run(bucket)
+    assert bucket.calls['upload'] == uploads
+    assert read_json('output.json') == output
+    assert read_json('temp_images/run_metrics.json')['counters']['series_carried_over'] == 3
+    # The carried-over records are spilled to disk for the run, then cleaned up
+    assert not os.path.exists('temp_images/series_journal_carried.jsonl')
+
+def test_sweep_keeps_the_images_of_every_duplicate_title(origin):
+    from immutable_storage import sweep
+
+    write_json('input.json', [
+        {'title': 'Silo', 'featured_image': 'https://vegamovies.ps/wp-content/uploads/silo-s1.jpg'},
+        {'title': 'Silo', 'featured_image': 'https://vegamovies.ps/wp-content/uploads/silo-s2.jpg'}
+    ])
+    bucket = FakeBucket()
+    randomabc.process_series_json(input_file='input.json', output_file='output.json', bucket=bucket, export_dir=None)
+    urls = [r['featured_image'] for r in read_json('output.json')]
+    assert len(set(urls)) == 2
+
+    sweep(bucket, delete=True, min_age_hours=0)
+    base = f"https://storage.googleapis.com/{bucket.name}/"
+    assert all(url[len(base):] in bucket.blobs for url in urls)
+
+@pytest.fixture
+def stalling_mirror():
+    """
+    Raw origin: /slow sends headers and a few bytes, then stalls; /fast sends
+    a whole JPEG. `hung_up` is set once the client drops the stalled request.
+    """
+    import io
+    import socket
+    import threading
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new('RGB', (300, 450), (20, 80, 40)).save(buf, 'JPEG')
+    jpeg = buf.getvalue()
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen()
+    hung_up = threading.Event()
+
+    def handle(conn):
+        with conn:
+            request = conn.recv(4096)
+            if b' /slow' in request:
+                conn.sendall(b"HTTP/1.1 200 OK\r\nContent-Type: image/jpeg\r\n"
+                             b"Content-Length: %d\r\n\r\n" % len(jpeg) + jpeg[:100])
+                conn.settimeout(30)
+                try:
+                    conn.recv(1)
+                except OSError:
+                    pass
+                hung_up.set()
+            else:
+                conn.sendall(b"HTTP/1.1 200 OK\r\nContent-Type: image/jpeg\r\n"
+                             b"Content-Length: %d\r\n\r\n" % len(jpeg) + jpeg)
+
+    def serve():
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return
+            threading.Thread(target=handle, args=(conn,), daemon=True).start()
+
+    threading.Thread(target=serve, daemon=True).start()
+    yield f"http://127.0.0.1:{server.getsockname()[1]}", hung_up
+    server.close()
+
+def test_hedge_winner_releases_a_stalled_loser(stalling_mirror, monkeypatch):
+    base, hung_up = stalling_mirror
+    monkeypatch.setattr(http_client, '_client', http_client.PooledHttpClient())
+    randomabc.start_race_pool(image_workers=1)
+    try:
+        monkeypatch.setattr(randomabc, 'HEDGE_DELAY', 0.2)
+        started = time.monotonic()
+        info = randomabc.resolve_hedged([f"{base}/slow", f"{base}/fast"], 'image.jpg', '127.0.0.1')
+        assert info['width'] == 300
+        # HEDGE_DELAY is read on each call, so the second mirror starts after 0.2s
+        assert time.monotonic() - started < 1
+        # The loser is cut off right away instead of holding its thread until the read timeout
+        assert hung_up.wait(2)
+    finally:
+        randomabc.shutdown_race_pool()
+
+def test_resolution_settings_apply_at_runtime(origin, monkeypatch):
+    modes = []
+    resolve_sequential = randomabc.resolve_sequential
+
+    def spy(*args, **kwargs):
+        modes.append('sequential')
+        return resolve_sequential(*args, **kwargs)
+
+    monkeypatch.setattr(randomabc, 'resolve_sequential', spy)
+    monkeypatch.setattr(randomabc, 'RESOLUTION_MODE', 'sequential')
+    path, placeholder = randomabc.download_image('https://vegamovies.ps/wp-content/uploads/silo.jpg', 'Silo', 'featured')
+    assert path and not placeholder
+    assert modes == ['sequential']
+
+def test_placeholders_are_identical_across_processes():
+    first = randomabc.generate_placeholder_image('Silo', 'featured', 'first.png')
+    # A new process starts without the cached background
+    randomabc.placeholder_background.cache_clear()
+    second = randomabc.generate_placeholder_image('Silo', 'featured', 'second.png')
+    with open(first, 'rb') as a, open(second, 'rb') as b:
+        assert a.read() == b.read()
+
+def test_each_run_reports_its_own_metrics():
+    # No images, so the runs need no network
+    write_json('input.json', [{'title': f"Show {n}"} for n in range(13)])
+    for _ in range(3):
+        randomabc.process_series_json(input_file='input.json', output_file='output.json', bucket=FakeBucket(),
+                                      export_dir=None)
+        report = read_json('temp_images/run_metrics.json')
+        assert report['items']['series']['count'] == 13
+
+def test_placeholder_images_are_retried_by_incremental_runs(monkeypatch):
+    # Every host answers 404, so each image ends up as a placeholder
+    origin = SyntheticOrigin(profiles={'missing.example': {'missing': True}}, latency_scale=0, error_rate=0).start()
+    client = http_client.PooledHttpClient(adapter_class=offline_adapter_class(origin.port, origin.dead_port, set()))
+    monkeypatch.setattr(http_client, '_client', client)
+    write_json('input.json', [{'title': 'Silo', 'featured_image': 'https://missing.example/silo.jpg'}])
+
+    def run():
+        randomabc.process_series_json(input_file='input.json', output_file='output.json', bucket=FakeBucket(),
+                                      incremental=True, export_dir=None)
+        return read_json('temp_images/run_metrics.json')['counters']
+
+    try:
+        counters = run()
+        assert counters['series_incomplete'] == 1
+        assert read_json('temp_images/series_manifest.json') == {}
+
+        monkeypatch.setattr(randomabc, 'FORCE_RECHECK', True)
+        counters = run()
+        assert 'series_carried_over' not in counters
+        assert counters['download_failures'] == 1
+    finally:
+        origin.stop()
+
+def test_switching_transcoding_off_at_runtime(origin, monkeypatch):
+    write_json('input.json', generate_catalog('series', 2))
+    monkeypatch.setattr(randomabc, 'TRANSCODE_VARIANTS', False)
+    randomabc.process_series_json(input_file='input.json', output_file='output.json', bucket=FakeBucket(),
+                                  export_dir=None)
+    output = read_json('output.json')
+    assert all(r['featured_image'].startswith('https://storage.googleapis.com/') for r in output)
+    assert not any('featured_image_variants' in r for r in output)
+
+def test_switching_incremental_uploads_off_at_runtime(origin, monkeypatch):
+    write_json('input.json', generate_catalog('series', 2))
+    # Content-hashed uploads are never repeated, so this covers the fixed paths
+    monkeypatch.setattr(randomabc, 'IMMUTABLE_UPLOADS', False)
+    bucket = FakeBucket()
+
+    def run():
+        randomabc.process_series_json(input_file='input.json', output_file='output.json', bucket=bucket,
+                                      export_dir=None)
+        return bucket.calls['upload']
+
+    uploads = run()
+    assert run() == uploads
+    monkeypatch.setattr(randomabc, 'INCREMENTAL_UPLOADS', False)
+    assert run() > uploads
@@ -0,0 +1,89 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+
+MANIFEST_FILE = os.path.join('temp_images', 'upload_manifest.json')
+
+def file_md5_base64(path):
+    """MD5 of a file in the base64 form Cloud Storage reports as blob.md5_hash"""
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return base64.b64encode(digest.digest()).decode('ascii')
+
+class UploadManifest:
+    """
+    Local record of what was uploaded where: {storage_path: {md5, public_url}}.
+    Content-hashed uploads also keep alias_url, the fixed-path URL the same
+    image had before, so old catalog URLs can be rewritten.
+    """
+
+    def __init__(self, path=MANIFEST_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except Exception as e:
+                print(f"Ignoring unreadable upload manifest {path}: {str(e)}")
+
+    def get(self, storage_path):
+        with self._lock:
+            return self._entries.get(storage_path)
+
+    def record(self, storage_path, md5_hash, public_url, alias_url=None):
+        entry = {'md5': md5_hash, 'public_url': public_url}
+        if alias_url:
+            entry['alias_url'] = alias_url
+        with self._lock:
+            # Re-inserting keeps entries in upload order, so the newest version of an alias wins
+            self._entries.pop(storage_path, None)
+            self._entries[storage_path] = entry
+            self._dirty = True
+
+    def forget(self, storage_path):
+        with self._lock:
+            if self._entries.pop(storage_path, None) is not None:
+                self._dirty = True
+
+    def paths(self):
+        with self._lock:
+            return set(self._entries)
+
+    def alias_urls(self):
+        """{fixed-path URL: current content-hashed URL}"""
+        with self._lock:
+            return {entry['alias_url']: entry['public_url']
+                    for entry in self._entries.values() if entry.get('alias_url')}
+
+    def save(self):
+        """Write the manifest to disk if anything changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = json.dumps(self._entries, indent=2)
+            self._dirty = False
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(snapshot)
+        os.replace(tmp_path, self.path)
+
+_manifest = None
+_manifest_lock = threading.Lock()
+
+def get_upload_manifest():
+    """Return the upload manifest shared by every upload in this run"""
+    global _manifest
+    with _manifest_lock:
+        if _manifest is None:
+            _manifest = UploadManifest()
+        return _manifest